@@ -0,0 +1,431 @@
+import hashlib, json, os, pickle, functools, socket, threading, time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+
+from rq import Queue
+from rq.job import Job
+from rq.exceptions import NoSuchJobError
+
+import inDelphi
+import lib
+from worker import conn
+
+##
+# Batch mode predictions as rq jobs
+##
+# A batch is split into chunks of CHUNK_GRNAS gRNAs, each predicted by
+# one job on the worker. All chunks of a batch go to one queue chosen
+# by estimated cost, so small batches are not stuck behind large ones.
+# Job ids are derived from the batch parameters, so resubmitting a batch
+# reuses its finished chunks.
+#
+# With INDELPHI_BATCH_PROCESSES > 0, chunks instead run in a process
+# pool of the web tier, one chunk per process, and results are kept in
+# redis under the same ids. The pool is created after the models are
+# loaded, so on Linux, where processes start by fork, its processes
+# share them copy-on-write.
+#
+# Each web process (gunicorn worker) forks its own pool, so the web tier
+# runs up to (gunicorn workers) x INDELPHI_BATCH_PROCESSES prediction
+# processes. A queued chunk records the web process that owns it, and
+# is treated as failed if that process is gone or the chunk is older
+# than JOB_TIMEOUT, so it can be resubmitted.
+CHUNK_GRNAS = 40
+QUEUE_COSTS = [
+  # (queue, max number of gRNA x celltype predictions)
+  ('high', 80),
+  ('default', 1000),
+  ('low', None),
+]
+JOB_TIMEOUT = 600 # seconds
+RESULT_TTL = 60 * 60 # seconds
+BATCH_PROCESSES = int(os.environ.get('INDELPHI_BATCH_PROCESSES', 0))
+
+process_pool = None
+process_pool_pid = None
+process_pool_lock = threading.Lock()
+
+def get_batch_id(parameters):
+  return hashlib.sha1(json.dumps(parameters, sort_keys = True).encode('utf-8')).hexdigest()
+
+def get_chunk_job_id(batch_id, chunk_idx):
+  return 'batch-%s-%s' % (batch_id, chunk_idx)
+
+def is_scan(pam):
+  return pam.count('N') == len(pam)
+
+def has_genotype_options(parameters):
+  # Repairs to spec. and Deletes spec. need genotype-level predictions
+  adv_matchseq, adv_poi, adv_delstart, adv_delend = parameters[3:]
+  if adv_matchseq is not None and len(adv_matchseq) != 0:
+    return True
+  if adv_delstart is not None and adv_delend is not None:
+    if len(adv_delstart) > 0 and len(adv_delend) > 0:
+      return int(adv_delstart) < int(adv_delend)
+  return False
+
+def uses_scan(parameters):
+  # A PAM of all N uses the vectorized scan of every cutsite, which gives
+  # standard statistics only. With genotype-level options, every cutsite
+  # is predicted as a gRNA instead, with the same sites and statistics.
+  return is_scan(parameters[1].upper()) and not has_genotype_options(parameters)
+
+def count_batch_grnas(parameters):
+  seq, pam = parameters[0].upper(), parameters[1].upper()
+  if is_scan(pam):
+    return 2 * (len(seq) - 2 * inDelphi.SCAN_FLANK)
+  return len(find_batch_sites(seq, pam))
+
+def get_chunk_size(num_grnas):
+  # In the process pool, a batch is split across all processes
+  if process_pool is None:
+    return CHUNK_GRNAS
+  return max(1, min(CHUNK_GRNAS, -(-num_grnas // BATCH_PROCESSES)))
+
+def get_num_chunks(parameters, num_grnas):
+  # The vectorized scan runs as one chunk
+  if uses_scan(parameters):
+    return 1
+  return -(-num_grnas // get_chunk_size(num_grnas))
+
+def get_queue_name(num_grnas, num_celltypes):
+  cost = num_grnas * num_celltypes
+  for queue_name, max_cost in QUEUE_COSTS:
+    if max_cost is None or cost <= max_cost:
+      return queue_name
+
+def predict_chunk(parameters, chunk_idx, chunk_size = CHUNK_GRNAS):
+  # rq job and process pool function
+  return predict_batch_stats(parameters, chunk_idx = chunk_idx, chunk_size = chunk_size)
+
+##
+# Process pool
+##
+def init_process_pool(rebuild = False):
+  # Call after inDelphi.init_model(). No-op unless INDELPHI_BATCH_PROCESSES > 0.
+  # A pool inherited from a parent process, or rebuild, makes a new one.
+  global process_pool, process_pool_pid
+  if BATCH_PROCESSES == 0:
+    return None
+  with process_pool_lock:
+    if process_pool is None or process_pool_pid != os.getpid() or rebuild:
+      if process_pool is not None and process_pool_pid == os.getpid():
+        process_pool.shutdown(wait = False)
+      process_pool = ProcessPoolExecutor(max_workers = BATCH_PROCESSES)
+      process_pool_pid = os.getpid()
+  return process_pool
+
+def __get_local_result_key(job_id):
+  return '%s-result' % (job_id)
+
+def __store_local_result(job_id, future):
+  # Runs in the web process when a chunk is done
+  if future.cancelled() or future.exception() is not None:
+    state = ('failed', None)
+  else:
+    state = ('finished', future.result())
+  conn.set(__get_local_result_key(job_id), pickle.dumps(state), ex = RESULT_TTL)
+  return
+
+def __is_stale_owner(owner):
+  # owner: (hostname, pid, submit time) of the web process running a chunk
+  hostname, pid, submit_time = owner
+  if time.time() - submit_time > JOB_TIMEOUT:
+    return True
+  if hostname != socket.gethostname():
+    return False
+  try:
+    os.kill(pid, 0)
+  except ProcessLookupError:
+    return True
+  except PermissionError:
+    pass
+  return False
+
+def __fetch_local_chunk(job_id):
+  # Returns (status, result) of a chunk run in the process pool, or None.
+  # A queued chunk holds its owner in place of the result.
+  state = conn.get(__get_local_result_key(job_id))
+  if state is None:
+    return None
+  status, result = pickle.loads(state)
+  if status == 'queued' and __is_stale_owner(result):
+    return ('failed', None)
+  return (status, result)
+
+def __submit_local_chunk(parameters, chunk_idx, chunk_size, job_id):
+  state = __fetch_local_chunk(job_id)
+  if state is not None and state[0] != 'failed':
+    return
+  owner = (socket.gethostname(), os.getpid(), time.time())
+  conn.set(__get_local_result_key(job_id), pickle.dumps(('queued', owner)), ex = RESULT_TTL)
+  try:
+    future = init_process_pool().submit(predict_chunk, parameters, chunk_idx, chunk_size)
+  except BrokenProcessPool:
+    # A pool process died, e.g. out of memory
+    future = init_process_pool(rebuild = True).submit(predict_chunk, parameters, chunk_idx, chunk_size)
+  future.add_done_callback(functools.partial(__store_local_result, job_id))
+  return
+
+##
+# Submitting and polling
+##
+def submit_batch(parameters):
+  # Enqueues every chunk that is not already queued or finished.
+  # Returns the batch id.
+  batch_id = get_batch_id(parameters)
+  num_grnas = count_batch_grnas(parameters)
+  num_chunks = get_num_chunks(parameters, num_grnas)
+  chunk_size = get_chunk_size(num_grnas)
+  queue = Queue(get_queue_name(num_grnas, len(parameters[2])), connection = conn)
+  conn.set('batch-%s' % (batch_id), num_chunks, ex = RESULT_TTL)
+  for chunk_idx in range(num_chunks):
+    job_id = get_chunk_job_id(batch_id, chunk_idx)
+    if process_pool is not None:
+      __submit_local_chunk(parameters, chunk_idx, chunk_size, job_id)
+      continue
+    if Job.exists(job_id, connection = conn):
+      status = Job.fetch(job_id, connection = conn).get_status()
+      if status != 'failed':
+        continue
+    queue.enqueue_call(
+      predict_chunk,
+      args = (parameters, chunk_idx, chunk_size),
+      timeout = JOB_TIMEOUT,
+      result_ttl = RESULT_TTL,
+      job_id = job_id,
+    )
+  return batch_id
+
+def __fetch_chunks(batch_id):
+  # Returns (status, result) of every chunk, with status 'failed' for
+  # chunks that are gone
+  num_chunks = conn.get('batch-%s' % (batch_id))
+  if num_chunks is None:
+    return []
+  chunks = []
+  for chunk_idx in range(int(num_chunks)):
+    job_id = get_chunk_job_id(batch_id, chunk_idx)
+    if process_pool is not None:
+      state = __fetch_local_chunk(job_id)
+      chunks.append(state if state is not None else ('failed', None))
+      continue
+    try:
+      job = Job.fetch(job_id, connection = conn)
+      status = job.get_status()
+      chunks.append((status, job.result if status == 'finished' else None))
+    except NoSuchJobError:
+      chunks.append(('failed', None))
+  return chunks
+
+def get_batch_progress(batch_id):
+  # Returns (num_finished, num_failed, num_chunks)
+  statuses = [status for status, result in __fetch_chunks(batch_id)]
+  return statuses.count('finished'), statuses.count('failed'), len(statuses)
+
+def get_batch_stats(batch_id):
+  # Finalized statistics of all finished chunks so far, or None.
+  # Chunks are concatenated in order, then sorted by cutsite.
+  results = [result for status, result in __fetch_chunks(batch_id) if status == 'finished']
+  if len(results) == 0:
+    return None
+  return finalize_batch_stats(pd.concat(results, ignore_index = True))
+
+##
+# Predictions
+##
+def predict_batch_stats(parameters, chunk_idx = None, chunk_size = CHUNK_GRNAS):
+  seq, pam, celltypes, adv_matchseq, adv_poi, adv_delstart, adv_delend = parameters
+  # When submit button clicked, find all gRNAs matching PAM in sequence.
+  # Advanced options:
+  #   if matchseq is provided, include a column on
+  #     sum frequencies of repair gts matching sequence
+  #     e.g., pathogenic -> wildtype repair
+  #   if deletion range is provided, include a column on
+  #     sum frequencies of repair gts deleting specified positions.
+  #   if position of interest is provided, include a column on
+  #     cutsite distance to position of interest
+  # A PAM of all N instead scans every cutsite on both strands, see
+  # uses_scan.
+  #
+  # With chunk_idx, only predicts that chunk of chunk_size gRNAs.
+  # Returns rows in no particular order; see finalize_batch_stats.
+  dd = defaultdict(list)
+
+  assert 2 <= len(pam) <= 6
+  seq = seq.upper()
+  pam = pam.upper()
+
+  # Check and initialize advanced settings
+  adv_matchseq_flag = False
+  if adv_matchseq is not None and len(adv_matchseq) != 0:
+    adv_matchseq = adv_matchseq.upper()
+    adv_matchseq_flag = True
+  adv_poi_flag = False
+  if adv_poi is not None and len(adv_poi) > 0:
+    # adv_poi is 1-indexed, switch to 0-index
+    adv_poi = int(adv_poi) - 1
+    adv_poi_flag = True
+  adv_del_flag = False
+  if adv_delstart is not None and adv_delend is not None:
+    if len(adv_delstart) > 0 and len(adv_delend) > 0:
+      adv_delstart, adv_delend = int(adv_delstart), int(adv_delend)
+      if adv_delstart < adv_delend:
+        adv_delstart -= 1
+        adv_delend -= 1
+        adv_del_flag = True
+
+  if uses_scan(parameters):
+    all_stats = scan_batch_stats(seq, pam, celltypes)
+    if adv_poi_flag:
+      all_stats['Dist. to POI'] = dist_to_poi(all_stats['Cutsite'], adv_poi)
+    return all_stats
+
+  # Search for gRNAs matching PAM
+  sites = find_batch_sites(seq, pam)
+  assert len(sites) >= 1
+  if chunk_idx is not None:
+    sites = sites[chunk_idx * chunk_size : (chunk_idx + 1) * chunk_size]
+
+  # inDelphi predictions and standard statistics for all gRNAs at once.
+  # Deletions are shared across cell types, so each extra cell type
+  # only adds the 1-bp insertion step.
+  preds = inDelphi.predict_batch_all_celltypes(
+    [s[0] for s in sites], 
+    [s[1] for s in sites], 
+    celltypes = celltypes,
+    as_dataframe = False,
+  )
+  rows = []
+  for site, pred in zip(sites, preds):
+    for celltype in celltypes:
+      pred_df, stats = pred[celltype]
+      rows.append((site, celltype, pred_df, stats))
+  all_stats = pd.DataFrame([stats for site, celltype, pred_df, stats in rows])
+
+  del_dfs, del_cutsites, adv_del_intervals = [], [], []
+  for (local_seq, local_cutsite, grna_orient, cand_pam), celltype, pred_df, stats in rows:
+    dd['gRNA orientation'].append(grna_orient)
+    dd['gRNA'].append(local_seq[local_cutsite - 17 : local_cutsite + 3])
+    dd['PAM'].append(cand_pam)
+    if grna_orient == '+':
+      cutsite_plus = local_cutsite
+    else:
+      cutsite_plus = len(seq) - local_cutsite
+    dd['Cutsite'].append(cutsite_plus)
+
+    # Detailed link
+    sm_link = lib.encode_dna_to_url_path_single(local_seq, local_cutsite, celltype)
+    dd['URL'].append('%s' % (sm_link))
+
+    if adv_matchseq_flag or adv_del_flag:
+      stats = pd.DataFrame(stats, index = [0])
+      pred_df = inDelphi.add_mhless_genotypes(pred_df.to_dataframe(), stats)
+
+    # Handle advanced options
+    if adv_matchseq_flag:
+      dd['Repairs to spec.'].append(inDelphi.get_genotype_frequency(pred_df, stats, adv_matchseq))
+
+    if adv_poi_flag:
+      dd['Dist. to POI'].append(dist_to_poi(cutsite_plus, adv_poi))
+
+    if adv_del_flag:
+      if grna_orient == '+':
+        adv_del_intervals.append((adv_delstart, adv_delend))
+      else:
+        adv_del_intervals.append((len(seq) - adv_delend, len(seq) - adv_delstart))
+      del_dfs.append(pred_df[pred_df['Category'] == 'del'])
+      del_cutsites.append(local_cutsite)
+
+  if adv_del_flag:
+    dd['Deletes spec.'] = get_deletes_spec_freqs(del_dfs, del_cutsites, adv_del_intervals)
+
+  # Add metadata columns and advanced settings
+  for col in dd:
+    all_stats[col] = dd[col]
+  return all_stats
+
+def get_deletes_spec_freqs(del_dfs, cutsites, intervals):
+  # For each gRNA, sums the frequencies of deletions that remove all of
+  # [start, end) in local coordinates. A deletion flanked by
+  # microhomology of length m can be placed at any of m + 1 shifts to
+  # the left, so it contains [start, end) if for some shift 0 <= k <= m
+  #   del_start - k <= start and end <= del_end - k,
+  # that is, if max(0, del_start - start) <= min(m, del_end - end).
+  # All gRNAs are handled in one pass over the concatenated rows.
+  if len(del_dfs) == 0:
+    return []
+  grna_idxs = np.repeat(np.arange(len(del_dfs)), [len(df) for df in del_dfs])
+  lens = np.concatenate([df['Length'].values for df in del_dfs]).astype(int)
+  gt_poss = np.concatenate([df['Genotype position'].values for df in del_dfs]).astype(int)
+  mh_lens = np.concatenate([df['Microhomology length'].values for df in del_dfs]).astype(int)
+  freqs = np.concatenate([df['Predicted frequency'].values for df in del_dfs]).astype(float)
+  starts, ends = np.array(intervals, dtype = int).T
+
+  del_starts = np.asarray(cutsites)[grna_idxs] - lens + gt_poss
+  del_ends = del_starts + lens
+  min_shift = np.maximum(0, del_starts - starts[grna_idxs])
+  max_shift = np.minimum(mh_lens, del_ends - ends[grna_idxs])
+  contains = (min_shift <= max_shift) & (starts[grna_idxs] < ends[grna_idxs])
+  return list(np.bincount(grna_idxs[contains], weights = freqs[contains], minlength = len(del_dfs)))
+
+def find_batch_sites(seq, pam):
+  # gRNAs matching PAM on both strands, as
+  # (local_seq, local_cutsite, grna_orient, cand_pam)
+  sites = []
+  seqs = [seq, lib.revcomp(seq)]
+  for local_seq, grna_orient, cutsites in zip(seqs, ['+', '-'], lib.find_pam_sites(seq, pam)):
+    for local_cutsite in cutsites:
+      cand_pam = local_seq[local_cutsite + 3 : local_cutsite + 3 + len(pam)]
+      sites.append((local_seq, local_cutsite, grna_orient, cand_pam))
+  return sites
+
+def dist_to_poi(cutsite_plus, adv_poi):
+  # Works on ints or arrays of + strand cutsites
+  cutsite_plus = np.asarray(cutsite_plus)
+  dist = np.where(adv_poi > cutsite_plus, np.abs(cutsite_plus - 1 - adv_poi), np.abs(cutsite_plus - adv_poi))
+  if dist.ndim == 0:
+    return int(dist)
+  return dist
+
+def scan_batch_stats(seq, pam, celltypes):
+  # Standard statistics for every cutsite from inDelphi.scan_all_cutsites,
+  # shaped like the per-gRNA rows built in predict_batch_stats.
+  # Batches with advanced options needing genotypes do not use the scan,
+  # see uses_scan.
+  sites, scan_stats = inDelphi.scan_all_cutsites(seq, celltypes = celltypes)
+  seqs = {'+': seq, '-': lib.revcomp(seq)}
+  encoded = {orient: lib.encode_dna(seqs[orient]) for orient in seqs}
+
+  orients = list(sites['gRNA orientation'])
+  local_cutsites = list(sites['Local cutsite'])
+  grnas = [seqs[o][c - 17 : c + 3] for o, c in zip(orients, local_cutsites)]
+  pams = [seqs[o][c + 3 : c + 3 + len(pam)] for o, c in zip(orients, local_cutsites)]
+
+  dfs = []
+  for celltype in celltypes:
+    df = pd.DataFrame(scan_stats[celltype], columns = inDelphi.SCAN_STATS_COLUMNS)
+    df['Reference sequence'] = [seqs[o] for o in orients]
+    df['Celltype'] = celltype
+    df['gRNA orientation'] = orients
+    df['gRNA'] = grnas
+    df['PAM'] = pams
+    df['Cutsite'] = sites['Cutsite'].values
+    df['URL'] = ['/single_%s_%s_%s_%s' % (celltype, encoded[o][0], encoded[o][1], c) for o, c in zip(orients, local_cutsites)]
+    dfs.append(df)
+  return pd.concat(dfs, ignore_index = True)
+
+def finalize_batch_stats(all_stats):
+  # Switch phi to log phi
+  all_stats['MH strength'] = np.log(all_stats['Phi'])  
+  all_stats = all_stats.drop(['Phi'], axis = 1)
+
+  # Sort by cutsite and relabel indices
+  all_stats = all_stats.sort_values(by = ['Cutsite', 'Celltype'])
+  all_stats = all_stats.reset_index(drop = True)
+
+  all_stats['ID'] = all_stats.index + 1
+  return all_stats
@@ -0,0 +1,12 @@
+import sys
+
+import inDelphi
+
+# One-time conversion of the pickled models in model/ into the
+# memory-mapped bundle that inDelphi.init_model loads.
+# Usage: python convert_models.py [run_iter] [param_iter]
+if __name__ == '__main__':
+  run_iter = sys.argv[1] if len(sys.argv) > 1 else 'aax'
+  param_iter = sys.argv[2] if len(sys.argv) > 2 else 'aag'
+  out_fn = inDelphi.convert_models(run_iter = run_iter, param_iter = param_iter)
+  print('Wrote %s' % (out_fn))
@@ -0,0 +1,344 @@
+import os, shutil, sys, threading, time, traceback
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+import model_bundle
+
+##
+# Local gene-table store
+##
+# The precomputed gene tables of one (genome, celltype), all genes in
+# one memory-mapped bundle with one array per column. Rows are sorted by
+# gene symbol, and a sorted gene symbol -> row range index makes a gene
+# query a binary search plus a slice of each column.
+#
+# Stores are synced from the indelphi-storage S3 bucket, or from a local
+# directory named by INDELPHI_GENE_STORE_SOURCE, by sync-all when the web
+# dyno starts (see Procfile). A store is only downloaded when the source
+# version (S3 ETag, or size and mtime of a source file) differs from the
+# one recorded next to the local copy. Requests only read local files,
+# and pick up a store once its sync has finished.
+#
+# For a (genome, celltype) without a store, per-gene csv tables are read
+# through a size-bounded on-disk LRU cache in STORE_DIR/tables/ that
+# persists across restarts and is shared by all worker processes.
+#
+# Usage:
+#   python gene_store.py build [genome] [celltype] [table_fn ...]
+#   python gene_store.py sync [genome] [celltype]
+#   python gene_store.py sync-all
+S3_BUCKET = 'indelphi-storage'
+CAS9_TYPE = 'SpCas9'
+STORE_DIR = os.environ.get('INDELPHI_GENE_STORE_DIR', os.path.dirname(os.path.realpath(__file__)) + '/gene-store/')
+STORE_SOURCE = os.environ.get('INDELPHI_GENE_STORE_SOURCE', 's3')
+GENE_COLUMN = 'Gene symbol'
+TABLE_CACHE_DIR = os.path.join(STORE_DIR, 'tables/')
+TABLE_CACHE_BYTES = int(os.environ.get('INDELPHI_GENE_CACHE_MB', 500)) * 2**20
+LOCK_TIMEOUT = 120 # seconds
+LOCK_POLL = 0.05 # seconds
+S3_POOL_SIZE = 10
+PREFETCH_THREADS = 2
+GENOME_BUILDS = ['hg38', 'mm10']
+CELLTYPES = ['mESC', 'U2OS', 'HCT116', 'HEK293', 'K562']
+
+stores = dict()
+store_lock = threading.RLock()
+s3_client = None
+s3_client_pid = None
+prefetch_executor = None
+
+def get_store_name(genome_build, celltype):
+  return '%s_%s_%s.bundle' % (genome_build, celltype, CAS9_TYPE)
+
+def get_store_fn(genome_build, celltype):
+  return os.path.join(STORE_DIR, get_store_name(genome_build, celltype))
+
+##
+# Building
+##
+def read_table(fn):
+  # Gene tables as csv (index in the first column), parquet or arrow
+  if fn.endswith('.parquet'):
+    return pd.read_parquet(fn)
+  if fn.endswith('.arrow'):
+    return pd.read_feather(fn)
+  return pd.read_csv(fn, index_col = 0)
+
+def build_store(tables, out_fn):
+  # tables: dataframes with the columns of the precomputed gene tables
+  df = pd.concat(tables, ignore_index = True)
+  df = df.sort_values(by = GENE_COLUMN, kind = 'mergesort').reset_index(drop = True)
+
+  arrays = dict()
+  string_columns = []
+  for col in df.columns:
+    if pd.api.types.is_numeric_dtype(df[col]):
+      values = df[col].values
+    else:
+      # Missing strings stay empty, as in the csv tables
+      values = np.char.encode(np.asarray(df[col].fillna(''), dtype = str), 'utf-8')
+      string_columns.append(col)
+    arrays['column.%s' % (col)] = values
+
+  symbols, starts, counts = np.unique(arrays['column.%s' % (GENE_COLUMN)], return_index = True, return_counts = True)
+  arrays['index.symbols'] = symbols
+  arrays['index.starts'] = starts
+  arrays['index.ends'] = starts + counts
+
+  meta = {
+    'columns': list(df.columns),
+    'string_columns': string_columns,
+    'num_rows': len(df),
+  }
+  model_bundle.write_bundle(out_fn, arrays, meta)
+  return out_fn
+
+##
+# Syncing
+##
+def get_s3_client():
+  # One pooled client per process, shared by request and prefetch threads
+  global s3_client, s3_client_pid
+  with store_lock:
+    if s3_client is None or s3_client_pid != os.getpid():
+      import boto3, botocore
+      s3_client = boto3.client(
+        's3',
+        aws_access_key_id = os.environ['S3_KEY'],
+        aws_secret_access_key = os.environ['S3_SECRET'],
+        config = botocore.config.Config(max_pool_connections = S3_POOL_SIZE),
+      )
+      s3_client_pid = os.getpid()
+  return s3_client
+
+def __fetch(name, out_fn):
+  # Raises FileNotFoundError if the source has no such object
+  if STORE_SOURCE == 's3':
+    import botocore
+    try:
+      get_s3_client().download_file(S3_BUCKET, name, out_fn)
+    except botocore.exceptions.ClientError as e:
+      if e.response['Error']['Code'] in ['404', 'NoSuchKey']:
+        raise FileNotFoundError('%s not in bucket %s' % (name, S3_BUCKET))
+      raise
+  else:
+    shutil.copyfile(os.path.join(STORE_SOURCE, name), out_fn)
+  return
+
+def __get_source_version(name):
+  # Raises FileNotFoundError if the source has no such object
+  if STORE_SOURCE == 's3':
+    import botocore
+    try:
+      return get_s3_client().head_object(Bucket = S3_BUCKET, Key = name)['ETag']
+    except botocore.exceptions.ClientError as e:
+      if e.response['Error']['Code'] in ['404', 'NoSuchKey', 'NotFound']:
+        raise FileNotFoundError('%s not in bucket %s' % (name, S3_BUCKET))
+      raise
+  st = os.stat(os.path.join(STORE_SOURCE, name))
+  return '%s-%s' % (st.st_size, st.st_mtime)
+
+def __read_local_version(version_fn):
+  try:
+    with open(version_fn) as f:
+      return f.read()
+  except FileNotFoundError:
+    return None
+
+def __tmp_fn(fn):
+  return '%s.%s.%s.tmp' % (fn, os.getpid(), threading.get_ident())
+
+def sync_store(genome_build, celltype, force = False):
+  # Fetches the store unless the local copy is of the current source
+  # version. The download is verified before it replaces the local copy.
+  fn = get_store_fn(genome_build, celltype)
+  version_fn = fn + '.version'
+  name = get_store_name(genome_build, celltype)
+  version = __get_source_version(name)
+  if not force and os.path.isfile(fn) and __read_local_version(version_fn) == version:
+    return fn
+  if not os.path.isdir(STORE_DIR):
+    os.makedirs(STORE_DIR)
+  tmp_fn = __tmp_fn(fn)
+  try:
+    __fetch(name, tmp_fn)
+    model_bundle.read_bundle(tmp_fn, verify = True)
+    os.replace(tmp_fn, fn)
+  finally:
+    if os.path.isfile(tmp_fn):
+      os.remove(tmp_fn)
+  with open(version_fn, 'w') as f:
+    f.write(version)
+  return fn
+
+def sync_all_stores(force = False):
+  # Syncs the store of every genome and celltype that the source has.
+  # Failures are logged and leave that store to the per-gene tables.
+  # Returns (synced file names, number of failures).
+  fns, num_failed = [], 0
+  for genome_build in GENOME_BUILDS:
+    for celltype in CELLTYPES:
+      try:
+        fns.append(sync_store(genome_build, celltype, force = force))
+      except FileNotFoundError:
+        print('No store for %s %s, using per-gene tables' % (genome_build, celltype))
+      except Exception:
+        print('Failed to sync store for %s %s, using per-gene tables' % (genome_build, celltype), file = sys.stderr)
+        traceback.print_exc()
+        num_failed += 1
+  return fns, num_failed
+
+##
+# Per-gene table cache
+##
+def get_table_name(genome_build, celltype, gene):
+  return '%s_%s_%s_%s.csv' % (genome_build, celltype, CAS9_TYPE, gene)
+
+def __acquire_lock(lock_fn):
+  # Returns True if this thread now holds the lock file
+  try:
+    os.close(os.open(lock_fn, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    return True
+  except FileExistsError:
+    return False
+
+def __evict_table_cache():
+  # Removes least recently used tables until the cache fits TABLE_CACHE_BYTES
+  entries = []
+  for name in os.listdir(TABLE_CACHE_DIR):
+    if not name.endswith('.csv'):
+      continue
+    try:
+      st = os.stat(os.path.join(TABLE_CACHE_DIR, name))
+    except FileNotFoundError:
+      continue
+    entries.append((st.st_mtime, st.st_size, name))
+  total = sum(size for mtime, size, name in entries)
+  for mtime, size, name in sorted(entries):
+    if total <= TABLE_CACHE_BYTES:
+      break
+    try:
+      os.remove(os.path.join(TABLE_CACHE_DIR, name))
+    except FileNotFoundError:
+      pass
+    total -= size
+  return
+
+def get_cached_table_fn(genome_build, celltype, gene):
+  # Local path of a per-gene table, downloading it on a cache miss.
+  # A lock file next to the table makes concurrent callers in any
+  # process wait for one download instead of repeating it.
+  if not os.path.isdir(TABLE_CACHE_DIR):
+    os.makedirs(TABLE_CACHE_DIR, exist_ok = True)
+  name = get_table_name(genome_build, celltype, gene)
+  fn = os.path.join(TABLE_CACHE_DIR, name)
+  lock_fn = fn + '.lock'
+  while True:
+    if os.path.isfile(fn):
+      # Mark as recently used
+      try:
+        os.utime(fn)
+        return fn
+      except FileNotFoundError:
+        continue
+    if __acquire_lock(lock_fn):
+      break
+    try:
+      if time.time() - os.path.getmtime(lock_fn) > LOCK_TIMEOUT:
+        os.remove(lock_fn)
+    except FileNotFoundError:
+      pass
+    time.sleep(LOCK_POLL)
+
+  tmp_fn = __tmp_fn(fn)
+  try:
+    __fetch(name, tmp_fn)
+    os.replace(tmp_fn, fn)
+  finally:
+    if os.path.isfile(tmp_fn):
+      os.remove(tmp_fn)
+    os.remove(lock_fn)
+  __evict_table_cache()
+  return fn
+
+def __prefetch(genome_build, celltype, gene):
+  if open_store(genome_build, celltype) is None:
+    get_cached_table_fn(genome_build, celltype, gene)
+  return
+
+def prefetch_gene_tables(genome_build, celltypes, gene):
+  # Starts syncing the stores or downloading the tables of a gene in
+  # the background. Returns the futures.
+  global prefetch_executor
+  with store_lock:
+    if prefetch_executor is None:
+      prefetch_executor = ThreadPoolExecutor(max_workers = PREFETCH_THREADS)
+  return [prefetch_executor.submit(__prefetch, genome_build, celltype, gene) for celltype in celltypes]
+
+##
+# Queries
+##
+def open_store(genome_build, celltype):
+  # Returns (arrays, meta) of the local store, or None if it has not
+  # been synced. Never fetches. A store replaced by a later sync is
+  # reopened.
+  fn = get_store_fn(genome_build, celltype)
+  try:
+    mtime = os.path.getmtime(fn)
+  except FileNotFoundError:
+    return None
+  key = (genome_build, celltype)
+  with store_lock:
+    if key not in stores or stores[key][0] != mtime:
+      stores[key] = (mtime, model_bundle.read_bundle(fn, verify = False))
+  return stores[key][1]
+
+def get_row_range(arrays, gene):
+  # Binary search of the gene symbol index. Returns (start, end) or None
+  symbols = arrays['index.symbols']
+  key = gene.encode('utf-8')
+  idx = np.searchsorted(symbols, key)
+  if idx == len(symbols) or symbols[idx] != key:
+    return None
+  return int(arrays['index.starts'][idx]), int(arrays['index.ends'][idx])
+
+def get_gene_table(genome_build, celltype, gene):
+  # Rows of one gene in the columns of the precomputed csv, indexed from 0.
+  # Raises KeyError for genes not in the store.
+  store = open_store(genome_build, celltype)
+  if store is None:
+    return read_table(get_cached_table_fn(genome_build, celltype, gene))
+  arrays, meta = store
+  row_range = get_row_range(arrays, gene)
+  if row_range is None:
+    raise KeyError('%s not in %s' % (gene, get_store_name(genome_build, celltype)))
+  start, end = row_range
+
+  dd = dict()
+  for col in meta['columns']:
+    values = arrays['column.%s' % (col)][start : end]
+    if col in meta['string_columns']:
+      values = np.char.decode(values, 'utf-8')
+    dd[col] = values
+  return pd.DataFrame(dd, columns = meta['columns'])
+
+if __name__ == '__main__':
+  if sys.argv[1:] == ['sync-all']:
+    fns, num_failed = sync_all_stores()
+    for fn in fns:
+      print('Synced %s' % (fn))
+    sys.exit(1 if num_failed > 0 else 0)
+  if len(sys.argv) < 4 or sys.argv[1] not in ['build', 'sync']:
+    print('Usage: python gene_store.py build [genome] [celltype] [table_fn ...]')
+    print('       python gene_store.py sync [genome] [celltype]')
+    print('       python gene_store.py sync-all')
+    sys.exit(1)
+  command, genome_build, celltype = sys.argv[1:4]
+  if command == 'build':
+    if not os.path.isdir(STORE_DIR):
+      os.makedirs(STORE_DIR)
+    out_fn = build_store([read_table(fn) for fn in sys.argv[4:]], get_store_fn(genome_build, celltype))
+    print('Wrote %s' % (out_fn))
+  else:
+    print('Synced %s' % (sync_store(genome_build, celltype, force = True)))
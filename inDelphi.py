@@ -1,586 +1,1605 @@
-from __future__ import division
-import numpy as np
-import pandas as pd
-import os
-from collections import defaultdict
-import pickle, copy
-from scipy.stats import entropy
-
-init_flag = False
-nn_params = None
-nn2_params = None
-normalizer = dict()
-rate_model = dict()
-bp_model = dict()
-
-##
-# Private NN methods
-##
-def __sigmoid(x):
-  return 0.5 * (np.tanh(x) + 1.0)
-
-def __nn_function(params, inputs):
-  # """Params is a list of (weights, bias) tuples.
-  #    inputs is an (N x D) matrix."""
-  inpW, inpb = params[0]
-  inputs = __sigmoid(np.dot(inputs, inpW) + inpb)
-  for W, b in params[1:-1]:
-    outputs = np.dot(inputs, W) + b
-    inputs = __sigmoid(outputs)
-  outW, outb = params[-1]
-  outputs = np.dot(inputs, outW) + outb
-  return outputs.flatten()
-
-##
-# Private sequence featurization
-##
-def __get_gc_frac(seq):
-  return (seq.count('C') + seq.count('G')) / len(seq)
-
-def __find_microhomologies(left, right):
-  start_idx = max(len(right) - len(left), 0)
-  mhs = []
-  mh = [start_idx]
-  for idx in range(min(len(right), len(left))):
-    if left[idx] == right[start_idx + idx]:
-      mh.append(start_idx + idx + 1)
-    else:
-      mhs.append(mh)
-      mh = [start_idx + idx +1]
-  mhs.append(mh)
-  return mhs
-
-def __featurize(seq, cutsite, DELLEN_LIMIT = 60):
-  # print('Using DELLEN_LIMIT = %s' % (DELLEN_LIMIT))
-  mh_lens, gc_fracs, gt_poss, del_lens = [], [], [], []
-  for del_len in range(1, DELLEN_LIMIT):
-    left = seq[cutsite - del_len : cutsite]
-    right = seq[cutsite : cutsite + del_len]
-    if len(left) != len(right):
-      break
-
-    mhs = __find_microhomologies(left, right)
-    for mh in mhs:
-      mh_len = len(mh) - 1
-      if mh_len > 0:
-        gtpos = max(mh)
-        gt_poss.append(gtpos)
-
-        s = cutsite - del_len + gtpos - mh_len
-        e = s + mh_len
-        mh_seq = seq[s : e]
-        gc_frac = __get_gc_frac(mh_seq)
-
-        mh_lens.append(mh_len)
-        gc_fracs.append(gc_frac)
-        del_lens.append(del_len)
-
-  return mh_lens, gc_fracs, gt_poss, del_lens
-
-##
-# Error catching
-##
-def error_catching(seq, cutsite):
-  # Type errors
-  if type(seq) != str:
-    return True, 'Sequence is not a string.'
-  if type(cutsite) != int:
-    return True, 'Cutsite is not an int.'
-  
-  # Cutsite bounds errors
-  if cutsite < 1 or cutsite > len(seq) - 1:
-    return True, 'Cutsite index is not within the sequence. Cutsite must be an integer between index 1 and len(seq) - 1, inclusive.'
-
-  # Sequence string errors
-  for c in set(seq):
-    if c not in list('ACGT'):
-      return True, 'Only ACGT characters allowed: Bad character %s' % (c)
-
-
-  return False, ''
-
-def provide_warnings(seq, cutsite):
-  if len(seq) <= 10:
-    print('Warning: Sequence length is very short (%s bp)' % (len(seq)))
-  return
-
-##
-# Private prediction methods
-##
-def __predict_dels(seq, cutsite):
-  ################################################################
-  #####
-  ##### Predict MH and MH-less deletions
-  #####
-  # Predict MH deletions
-
-  mh_len, gc_frac, gt_pos, del_len = __featurize(seq, cutsite)
-
-  # Form inputs
-  pred_input = np.array([mh_len, gc_frac]).T
-  del_lens = np.array(del_len).T
-  
-  # Predict
-  mh_scores = __nn_function(nn_params, pred_input)
-  mh_scores = mh_scores.reshape(mh_scores.shape[0], 1)
-  Js = del_lens.reshape(del_lens.shape[0], 1)
-  unfq = np.exp(mh_scores - 0.25*Js)
-
-  # Add MH-less contribution at full MH deletion lengths
-  mh_vector = np.array(mh_len)
-  mhfull_contribution = np.zeros(mh_vector.shape)
-  for jdx in range(len(mh_vector)):
-    if del_lens[jdx] == mh_vector[jdx]:
-      dl = del_lens[jdx]
-      mhless_score = __nn_function(nn2_params, np.array(dl))
-      mhless_score = np.exp(mhless_score - 0.25*dl)
-      mask = np.concatenate([np.zeros(jdx,), np.ones(1,) * mhless_score, np.zeros(len(mh_vector) - jdx - 1,)])
-      mhfull_contribution = mhfull_contribution + mask
-  mhfull_contribution = mhfull_contribution.reshape(-1, 1)
-  unfq = unfq + mhfull_contribution
-
-  # Store predictions to combine with mh-less deletion preds
-  pred_del_len = copy.copy(del_len)
-  pred_gt_pos = copy.copy(gt_pos)
-  pred_mh_len = copy.copy(mh_len)
-
-  ################################################################
-  #####
-  ##### Predict MH and MH-less deletions
-  #####
-  # Predict MH-less deletions
-  mh_len, gc_frac, gt_pos, del_len = __featurize(seq, cutsite)
-
-  unfq = list(unfq)
-
-  pred_mhless_d = defaultdict(list)
-  # Include MH-less contributions at non-full MH deletion lengths
-  nonfull_dls = []
-  for dl in range(1, 60):
-    if dl not in del_len:
-      nonfull_dls.append(dl)
-    elif del_len.count(dl) == 1:
-      idx = del_len.index(dl)
-      if mh_len[idx] != dl:
-        nonfull_dls.append(dl)
-    else:
-        nonfull_dls.append(dl)
-
-  mh_vector = np.array(mh_len)
-  for dl in nonfull_dls:
-    mhless_score = __nn_function(nn2_params, np.array(dl))
-    mhless_score = np.exp(mhless_score - 0.25*dl)
-
-    unfq.append(mhless_score)
-    pred_gt_pos.append('e')
-    pred_mh_len.append(0)
-    pred_del_len.append(dl)
-
-  unfq = np.array(unfq)
-  total_phi_score = float(sum(unfq))
-
-  nfq = np.divide(unfq, np.sum(unfq))  
-  pred_freq = list(nfq.flatten())
-
-  d = {'Length': pred_del_len, 'Genotype position': pred_gt_pos, 'Predicted frequency': pred_freq, 'Microhomology length': pred_mh_len}
-  pred_del_df = pd.DataFrame(d)
-  pred_del_df['Category'] = 'del'
-  return pred_del_df, total_phi_score
-
-def __predict_ins(seq, cutsite, pred_del_df, total_phi_score, celltype):
-  ################################################################
-  #####
-  ##### Predict Insertions
-  #####
-  # Predict 1 bp insertions
-  dlpred = []
-  for dl in range(1, 28+1):
-    crit = (pred_del_df['Length'] == dl)
-    dlpred.append(sum(pred_del_df[crit]['Predicted frequency']))
-  dlpred = np.array(dlpred) / sum(dlpred)
-  norm_entropy = entropy(dlpred) / np.log(len(dlpred))
-  precision = 1 - norm_entropy
-  log_phi_score = np.log(total_phi_score)
-
-  fiveohmapper = {'A': [1, 0, 0, 0], 
-                  'C': [0, 1, 0, 0], 
-                  'G': [0, 0, 1, 0], 
-                  'T': [0, 0, 0, 1]}
-  threeohmapper = {'A': [1, 0, 0, 0], 
-                   'C': [0, 1, 0, 0], 
-                   'G': [0, 0, 1, 0], 
-                   'T': [0, 0, 0, 1]}
-  fivebase = seq[cutsite - 1]
-  threebase = seq[cutsite]
-  onebp_features = fiveohmapper[fivebase] + threeohmapper[threebase] + [precision] + [log_phi_score]
-  for idx in range(len(onebp_features)):
-    val = onebp_features[idx]
-    onebp_features[idx] = (val - normalizer[celltype][idx][0]) / normalizer[celltype][idx][1]
-  onebp_features = np.array(onebp_features).reshape(1, -1)
-  rate_1bpins = float(rate_model[celltype].predict(onebp_features))
-
-  # Predict 1 bp genotype frequencies
-  pred_1bpins_d = defaultdict(list)
-  negfivebase = seq[cutsite - 2]
-  negfourbase = seq[cutsite - 1]
-  negthreebase = seq[cutsite]
-
-  if celltype in ['mESC', 'U2OS']:
-    for ins_base in bp_model[celltype][negfivebase][negfourbase][negthreebase]:
-      freq = bp_model[celltype][negfivebase][negfourbase][negthreebase][ins_base]
-      freq *= rate_1bpins / (1 - rate_1bpins)
-      pred_1bpins_d['Category'].append('ins')
-      pred_1bpins_d['Length'].append(1)
-      pred_1bpins_d['Inserted Bases'].append(ins_base)
-      pred_1bpins_d['Predicted frequency'].append(freq)
-  elif celltype in ['K562', 'HEK293', 'HCT116']:
-    for ins_base in bp_model[celltype][negfourbase]:
-      freq = bp_model[celltype][negfourbase][ins_base]
-      freq *= rate_1bpins / (1 - rate_1bpins)
-      pred_1bpins_d['Category'].append('ins')
-      pred_1bpins_d['Length'].append(1)
-      pred_1bpins_d['Inserted Bases'].append(ins_base)
-      pred_1bpins_d['Predicted frequency'].append(freq)
-
-  pred_1bpins_df = pd.DataFrame(pred_1bpins_d)
-  pred_df = pred_del_df.append(pred_1bpins_df, ignore_index = True)
-  pred_df['Predicted frequency'] /= sum(pred_df['Predicted frequency'])
-  return pred_df
-
-def __build_stats(seq, cutsite, pred_df, total_phi_score, celltype):
-  # Precision stats
-  overall_precision = 1 - entropy(pred_df['Predicted frequency']) / np.log(len(pred_df))
-  highest_fq = max(pred_df['Predicted frequency'])
-  highest_del_fq = max(pred_df[pred_df['Category'] == 'del']['Predicted frequency'])
-  highest_ins_fq = max(pred_df[pred_df['Category'] == 'ins']['Predicted frequency'])
-  
-  # Outcomes
-  ins_fq = sum(pred_df[pred_df['Category'] == 'ins']['Predicted frequency'])
-  crit = (pred_df['Category'] == 'del') & (pred_df['Genotype position'] != 'e')
-  mhdel_fq = sum(pred_df[crit]['Predicted frequency'])
-
-  crit = (pred_df['Category'] == 'del') & (pred_df['Genotype position'] == 'e')
-  nomhdel_fq = sum(pred_df[crit]['Predicted frequency'])
-
-  # Expected indel length
-  ddf = pred_df[pred_df['Category'] == 'del']
-  expected_indel_len = sum(ddf['Predicted frequency'] * ddf['Length'] / 100)
-  idf = pred_df[pred_df['Category'] == 'ins']
-  expected_indel_len += sum(idf['Predicted frequency'] * idf['Length'] / 100)
-
-  # Frameshifts
-  fsd = {'+0': 0, '+1': 0, '+2': 0}
-
-  crit = (pred_df['Category'] == 'ins')
-  ins1_fq = sum(pred_df[crit]['Predicted frequency'])
-  fsd['+1'] += ins1_fq
-
-  for del_len in set(pred_df['Length']):
-    crit = (pred_df['Category'] == 'del') & (pred_df['Length'] == del_len)
-    fq = sum(pred_df[crit]['Predicted frequency'])
-    fs = (-1 * del_len) % 3
-    fsd['+%s' % (fs)] += fq
-
-  stats = {'Phi': total_phi_score,
-           'Precision': overall_precision,
-           '1-bp ins frequency': ins_fq,
-           'MH del frequency': mhdel_fq,
-           'MHless del frequency': nomhdel_fq,
-           'Frameshift frequency': fsd['+1'] + fsd['+2'],
-           'Frame +0 frequency': fsd['+0'], 
-           'Frame +1 frequency': fsd['+1'], 
-           'Frame +2 frequency': fsd['+2'], 
-           'Highest outcome frequency': highest_fq,
-           'Highest del frequency': highest_del_fq,
-           'Highest ins frequency': highest_ins_fq,
-           'Expected indel length': expected_indel_len,
-           'Reference sequence': seq,
-           'Cutsite': cutsite,
-           'gRNA': seq[cutsite - 18 : cutsite + 3],
-           'gRNA orientation': '+',
-           'Celltype': celltype,
-          }
-  return stats
-
-##
-# Main public-facing prediction
-##
-def predict(seq, cutsite, celltype):
-  # Predict 1 bp insertions and all deletions (MH and MH-less)
-  #
-  # If no errors, returns a tuple (pred_df, stats)
-  # where pred_df is a dataframe and stats is a dict
-  #  
-  # If errors, returns a string
-  #
-  if init_flag == False:
-    init_model(celltype = celltype)
-
-  # Sanitize input
-  seq = seq.upper()
-  flag, error = error_catching(seq, cutsite)
-  if flag:
-    return error
-  provide_warnings(seq, cutsite)
-
-
-  # Make predictions
-  pred_del_df, total_phi_score = __predict_dels(seq, cutsite)
-  pred_df = __predict_ins(seq, cutsite, pred_del_df, total_phi_score, celltype)
-  pred_df['Predicted frequency'] *= 100
-
-  # Build stats
-  stats = __build_stats(seq, cutsite, pred_df, total_phi_score, celltype)
-  
-  return pred_df, stats
-
-##
-# Process predictions
-##
-def get_frameshift_fqs(pred_df):
-  # Returns a dataframe
-  #   - Frame
-  #   - Predicted frequency
-  #
-  fsd = {'+0': 0, '+1': 0, '+2': 0}
-
-  crit = (pred_df['Category'] == 'ins')
-  ins1_fq = sum(pred_df[crit]['Predicted frequency'])
-  fsd['+1'] += ins1_fq
-
-  for del_len in set(pred_df['Length']):
-    crit = (pred_df['Category'] == 'del') & (pred_df['Length'] == del_len)
-    fq = sum(pred_df[crit]['Predicted frequency'])
-    fs = (-1 * del_len) % 3
-    fsd['+%s' % (fs)] += fq
-
-  d = defaultdict(list)
-  d['Frame'] = list(fsd.keys())
-  d['Predicted frequency'] = list(fsd.values())
-  df = pd.DataFrame(d)
-  df = df.sort_values(by = 'Frame')
-  df = df.reset_index(drop = True)
-  return df
-
-def get_indel_length_fqs(pred_df):
-  # Returns a dataframe
-  #   - Indel length
-  #   - Predicted frequency
-  d = defaultdict(list)
-
-  crit = (pred_df['Category'] == 'ins')
-  ins1_fq = sum(pred_df[crit]['Predicted frequency'])
-  d['Indel length'].append('+1')
-  d['Predicted frequency'].append(ins1_fq)
-
-  for del_len in set(pred_df['Length']):
-    crit = (pred_df['Category'] == 'del') & (pred_df['Length'] == del_len)
-    fq = sum(pred_df[crit]['Predicted frequency'])
-    d['Indel length'].append('-%s' % (del_len))
-    d['Predicted frequency'].append(fq)
-
-  df = pd.DataFrame(d)
-  return df  
-
-def get_indel_length_breakdown(pred_df):
-  # Returns a dataframe
-  #   - Indel length
-  #   - Predicted frequency
-  d = defaultdict(list)
-
-  for ins_base in list('ACGT'):
-    crit = (pred_df['Category'] == 'ins') & (pred_df['Inserted Bases'] == ins_base)
-    ins1_fq = sum(pred_df[crit]['Predicted frequency'])
-    d['Indel length'].append('+1')
-    d['Predicted frequency'].append(ins1_fq)
-    d['Detail'].append(ins_base)
-
-  for del_len in set(pred_df['Length']):
-    crit = (pred_df['Category'] == 'del') & (pred_df['Length'] == del_len) & (pred_df['Genotype position'] == 'e')
-    fq = sum(pred_df[crit]['Predicted frequency'])
-    d['Indel length'].append('-%s' % (del_len))
-    d['Predicted frequency'].append(fq)
-    d['Detail'].append('MH-less')
-
-    crit = (pred_df['Category'] == 'del') & (pred_df['Length'] == del_len) & (pred_df['Genotype position'] != 'e')
-    fq = sum(pred_df[crit]['Predicted frequency'])
-    d['Indel length'].append('-%s' % (del_len))
-    d['Predicted frequency'].append(fq)
-    d['Detail'].append('Microhomology')
-
-  df = pd.DataFrame(d)
-  return df  
-
-def get_highest_frequency_indel(pred_df):
-  # Returns a row of pred_df
-  highest_fq = max(pred_df['Predicted frequency'])
-  row = pred_df[pred_df['Predicted frequency'] == highest_fq]
-  return row.iloc[0]
-
-def get_highest_frequency_length(pred_df):
-  idd = get_indel_length_fqs(pred_df)
-  highest_fq = max(idd['Predicted frequency'])
-  row = idd[idd['Predicted frequency'] == highest_fq]
-  return row.iloc[0]
-
-def get_precision(pred_df):
-  # Returns a row of pred_df
-  return 1 - entropy(pred_df['Predicted frequency']) / np.log(len(pred_df))
-
-##
-# Data reformatting
-##
-def add_genotype_column(pred_df, stats):
-  if 'Genotype' in pred_df.columns:
-    return
-  gts = []
-  if type(stats) == pd.DataFrame:
-    seq = stats['Reference sequence'].iloc[0]
-    cutsite = stats['Cutsite'].iloc[0]
-  elif type(stats) == dict:
-    seq = stats['Reference sequence']
-    cutsite = stats['Cutsite']
-
-  for idx, row in pred_df.iterrows():
-    gt_pos = row['Genotype position']
-    if gt_pos == 'e':
-      gt = np.nan
-    elif row['Category'] == 'del':
-      dl = row['Length']
-      gt_pos = int(gt_pos)
-      gt = seq[:cutsite - dl + gt_pos] + seq[cutsite + gt_pos:]
-    else:
-      ins_base = row['Inserted Bases']
-      gt = seq[:cutsite] + ins_base + seq[cutsite:]
-    gts.append(gt)
-  pred_df['Genotype'] = gts
-  return
-
-def add_name_column(pred_df, stats):
-  names = []
-  seq = stats['Reference sequence'].iloc[0]
-  cutsite = stats['Cutsite'].iloc[0]
-
-  for idx, row in pred_df.iterrows():
-    gt_pos = row['Genotype position']
-    if gt_pos == 'e':
-      name = 'del%s' % (row['Length'])
-    elif row['Category'] == 'del':
-      dl = row['Length']
-      gt_pos = int(gt_pos)
-      name = 'del%s' % (seq[cutsite - dl + gt_pos : cutsite + gt_pos])
-    else:
-      ins_base = row['Inserted Bases']
-      name = 'ins%s' % (ins_base)
-    names.append(name)
-  pred_df['Name'] = names
-  return
-
-def add_mhless_genotypes(pred_df, stats, length_cutoff = None):
-  # Adds genotype-resolution predictions for MH-less genotypes
-  # Be wary: MH-less genotypes have much lower replicability than
-  # microhomology genotypes. 
-  # This is included for user convenience.
-  seq = stats['Reference sequence'].iloc[0]
-  cutsite = stats['Cutsite'].iloc[0]
-
-  # Add insertions
-  new_pred_df = pred_df[pred_df['Category'] == 'ins']
-
-  # Add MH deletions
-  crit = (pred_df['Genotype position'] != 'e') & (pred_df['Category'] == 'del')
-  new_pred_df = new_pred_df.append(pred_df[crit], ignore_index = True)
-
-  # Add MHless deletions by length
-  if length_cutoff is None:
-    max_del_len = max(pred_df['Length']) + 1
-  else:
-    max_del_len = int(length_cutoff)
-    
-  mhless_dd = defaultdict(list)
-  for del_len in range(max_del_len):
-    crit = (pred_df['Category'] == 'del') & (pred_df['Length'] == del_len) & (pred_df['Genotype position'] == 'e')
-    subset = pred_df[crit]
-    if len(subset) == 0:
-      continue
-    total_freq = subset['Predicted frequency'].iloc[0]
-
-    left = seq[cutsite - del_len : cutsite]
-    right = seq[cutsite : cutsite + del_len]
-    mhs = __find_microhomologies(left, right)
-
-    has0 = bool([0] in mhs)
-    hasN = bool([del_len] in mhs)
-    nummid = 0
-    for idx in range(1, del_len):
-      if [idx] in mhs:
-        nummid += 1
-    hasmid = bool(nummid > 0)
-    num_mhless_cats = sum([has0, hasN, hasmid])
-    if num_mhless_cats == 0:
-      continue
-
-    frac_freq = total_freq / num_mhless_cats
-    total_freq_added = 0
-
-    for gt_pos, flag in zip([0, del_len], [has0, hasN]):
-      if flag:
-        mhless_dd['Genotype position'].append(gt_pos)
-        mhless_dd['Length'].append(del_len)
-        mhless_dd['Predicted frequency'].append(frac_freq)
-        total_freq_added += frac_freq
-
-    for idx in range(1, del_len):
-      mid_pos = idx
-      if [mid_pos] in mhs:
-        mhless_dd['Genotype position'].append(mid_pos)
-        mhless_dd['Length'].append(del_len)
-        mhless_dd['Predicted frequency'].append(frac_freq / nummid)
-        total_freq_added += frac_freq / nummid
-
-  mhless_df = pd.DataFrame(mhless_dd)
-  mhless_df['Category'] = 'del'
-  mhless_df['Microhomology length'] = 0
-  new_pred_df = new_pred_df.append(mhless_df, ignore_index = True)
-
-  return new_pred_df
-
-
-##
-# Init
-##
-def init_model(run_iter = 'aax', 
-               param_iter = 'aag'):
-  global init_flag
-  if init_flag != False:
-    return
-
-  print('Initializing models %s/%s...' % (run_iter, param_iter))
-
-  model_dir = os.path.dirname(os.path.realpath(__file__))
-  model_dir += '/model'
-
-  global nn_params
-  global nn2_params
-  with open('%s/%s_%s_nn.pkl' % (model_dir, run_iter, param_iter), 'rb') as f:
-    # load in python3.6 a pickle that was dumped from python2.7
-    nn_params = pickle.load(f, encoding = 'latin1')
-  with open('%s/%s_%s_nn2.pkl' % (model_dir, run_iter, param_iter), 'rb') as f:
-    nn2_params = pickle.load(f, encoding = 'latin1')
-
-  global normalizer
-  global rate_model
-  global bp_model
-  for celltype in ['mESC', 'U2OS', 'HEK293', 'HCT116', 'K562']:
-    with open('%s/bp_model_%s.pkl' % (model_dir, celltype), 'rb') as f:
-      bp_model[celltype] = pickle.load(f, encoding = 'latin1')
-    with open('%s/rate_model_%s.pkl' % (model_dir, celltype), 'rb') as f:
-      rate_model[celltype] = pickle.load(f, encoding = 'latin1')
-    with open('%s/Normalizer_%s.pkl' % (model_dir, celltype), 'rb') as f:
-      normalizer[celltype] = pickle.load(f, encoding = 'latin1')
-
-  init_flag = True
-
-  print('Done')
-  return
-
+from __future__ import division
+import numpy as np
+import pandas as pd
+import os
+from collections import defaultdict
+import pickle, copy, threading
+from scipy.special import entr
+import model_bundle
+
+CELLTYPES = ['mESC', 'U2OS', 'HEK293', 'HCT116', 'K562']
+
+init_flag = False
+nn_params = None
+nn2_params = None
+nn_table = None
+nn2_table = None
+normalizer = dict()
+rate_model = dict()
+bp_model = dict()
+bp_ins_codes = dict()
+bundle_arrays = None
+bundle_meta = None
+model_lock = threading.RLock()
+
+##
+# Private NN methods
+##
+def __sigmoid(x):
+  return 0.5 * (np.tanh(x) + 1.0)
+
+def __nn_function(params, inputs):
+  # """Params is a list of (weights, bias) tuples.
+  #    inputs is an (N x D) matrix."""
+  inpW, inpb = params[0]
+  inputs = __sigmoid(np.dot(inputs, inpW) + inpb)
+  for W, b in params[1:-1]:
+    outputs = np.dot(inputs, W) + b
+    inputs = __sigmoid(outputs)
+  outW, outb = params[-1]
+  outputs = np.dot(inputs, outW) + outb
+  return outputs.flatten()
+
+##
+# NN lookup tables
+##
+DELLEN_LIMIT = 60
+
+def __get_nn_table_inputs():
+  # The MH network only ever sees (mh_len, gc_frac) with
+  # gc_frac = gc_count / mh_len, and mh_len < DELLEN_LIMIT.
+  # Returns parallel arrays (mh_lens, gc_counts, gc_fracs).
+  mh_lens, gc_counts = [], []
+  for mh_len in range(1, DELLEN_LIMIT):
+    for gc_count in range(mh_len + 1):
+      mh_lens.append(mh_len)
+      gc_counts.append(gc_count)
+  mh_lens = np.array(mh_lens)
+  gc_counts = np.array(gc_counts)
+  return mh_lens, gc_counts, gc_counts / mh_lens
+
+def __eval_nn_table(params, inputs):
+  # Evaluates the network one input row at a time, exactly as
+  # a single-row forward pass would
+  return np.array([__nn_function(params, row.reshape(1, -1))[0] for row in inputs])
+
+def __build_nn_tables(nn_params, nn2_params):
+  # nn_table[mh_len, gc_count] is the MH network score,
+  # nn2_table[del_len] is the MH-less network score.
+  # Unreachable entries are nan.
+  # Returns (nn_table, nn2_table)
+  mh_lens, gc_counts, gc_fracs = __get_nn_table_inputs()
+  nn_table = np.full((DELLEN_LIMIT, DELLEN_LIMIT), np.nan)
+  nn_table[mh_lens, gc_counts] = __eval_nn_table(nn_params, np.array([mh_lens, gc_fracs]).T)
+
+  del_lens = np.arange(1, DELLEN_LIMIT)
+  nn2_table = np.full(DELLEN_LIMIT, np.nan)
+  nn2_table[del_lens] = __eval_nn_table(nn2_params, del_lens.reshape(-1, 1))
+  return nn_table, nn2_table
+
+def verify_nn_tables():
+  # Checks the lookup tables bit-for-bit against the live networks.
+  # Returns (True, '') or (False, description of mismatch)
+  mh_lens, gc_counts, gc_fracs = __get_nn_table_inputs()
+  live = __eval_nn_table(nn_params, np.array([mh_lens, gc_fracs]).T)
+  table = nn_table[mh_lens, gc_counts]
+  if not np.array_equal(live, table):
+    num_bad = int(np.sum(live != table))
+    return False, 'MH network table differs from live network at %s of %s inputs' % (num_bad, len(live))
+
+  del_lens = np.arange(1, DELLEN_LIMIT)
+  live = __eval_nn_table(nn2_params, del_lens.reshape(-1, 1))
+  table = nn2_table[del_lens]
+  if not np.array_equal(live, table):
+    num_bad = int(np.sum(live != table))
+    return False, 'MH-less network table differs from live network at %s of %s inputs' % (num_bad, len(live))
+  return True, ''
+
+##
+# 1-bp insertion rate model
+##
+class KNeighborsRateModel:
+  # NumPy evaluator for the pickled sklearn 0.18.1
+  # KNeighborsRegressor(weights = 'distance', metric = 'euclidean').
+  # Brute force search gives the same neighbors and distances as
+  # sklearn's kd_tree. Rows with tied distances replay the kd_tree
+  # search, since ties are resolved by its traversal order.
+  #
+  # tree: dict of the fitted kd_tree's idx_array, node idx_start,
+  # idx_end, is_leaf and node_bounds arrays
+  ROW_CHUNK = 1024
+
+  def __init__(self, fit_X, y, n_neighbors, tree):
+    self.fit_X = fit_X
+    self.y = y
+    self.n_neighbors = int(n_neighbors)
+    self.tree = tree
+
+  def kneighbors(self, X):
+    # Returns (neigh_dist, neigh_ind), sorted by distance
+    # Squared distances are accumulated one dimension at a time,
+    # in the same order as sklearn's euclidean rdist
+    k = self.n_neighbors
+    rdist = np.zeros((len(X), len(self.fit_X)))
+    for jdx in range(X.shape[1]):
+      rdist += (X[:, jdx, None] - self.fit_X[None, :, jdx]) ** 2
+
+    # The k + 1 nearest, sorted, to detect ties at the k-th neighbor
+    order = np.argpartition(rdist, min(k, len(self.fit_X) - 1), axis = 1)[:, :k + 1]
+    order = np.take_along_axis(order, np.argsort(np.take_along_axis(rdist, order, axis = 1), axis = 1), axis = 1)
+    sorted_rdist = np.take_along_axis(rdist, order, axis = 1)
+    neigh_ind = order[:, :k]
+    neigh_rdist = sorted_rdist[:, :k]
+
+    tie_rows = np.nonzero(np.any(sorted_rdist[:, 1:] == sorted_rdist[:, :-1], axis = 1))[0]
+    for row in tie_rows:
+      neigh_rdist[row], neigh_ind[row] = self.__query_tree(X[row], rdist[row])
+    return np.sqrt(neigh_rdist), neigh_ind
+
+  def __query_tree(self, pt, pt_rdist):
+    # sklearn's depth-first kd_tree query for one point, including
+    # its max-heap updates and final sort.
+    # pt_rdist: squared distances from pt to every training point
+    idx_array = self.tree['idx_array']
+    bounds = self.tree['node_bounds']
+    heap_rdist = np.full(self.n_neighbors, np.inf)
+    heap_ind = np.zeros(self.n_neighbors, dtype = int)
+
+    def min_rdist(i_node):
+      d_lo = bounds[0, i_node] - pt
+      d_hi = pt - bounds[1, i_node]
+      d = (d_lo + np.abs(d_lo)) + (d_hi + np.abs(d_hi))
+      rdist = 0.0
+      for val in d:
+        rdist += (0.5 * val) ** 2
+      return rdist
+
+    def query(i_node, rdist_lb):
+      if rdist_lb > heap_rdist[0]:
+        return
+      if self.tree['is_leaf'][i_node]:
+        for idx in idx_array[self.tree['idx_start'][i_node] : self.tree['idx_end'][i_node]]:
+          if pt_rdist[idx] < heap_rdist[0]:
+            self.__heap_push(heap_rdist, heap_ind, pt_rdist[idx], idx)
+        return
+      i1 = 2 * i_node + 1
+      i2 = i1 + 1
+      rdist_lb_1 = min_rdist(i1)
+      rdist_lb_2 = min_rdist(i2)
+      if rdist_lb_1 <= rdist_lb_2:
+        query(i1, rdist_lb_1)
+        query(i2, rdist_lb_2)
+      else:
+        query(i2, rdist_lb_2)
+        query(i1, rdist_lb_1)
+
+    query(0, min_rdist(0))
+    self.__simultaneous_sort(heap_rdist, heap_ind)
+    return heap_rdist, heap_ind
+
+  def __heap_push(self, heap_rdist, heap_ind, val, i_val):
+    # sklearn NeighborsHeap._push: replaces the root of a max-heap
+    size = len(heap_rdist)
+    if val > heap_rdist[0]:
+      return
+    i = 0
+    while True:
+      ic1 = 2 * i + 1
+      ic2 = ic1 + 1
+      if ic1 >= size:
+        break
+      elif ic2 >= size:
+        if heap_rdist[ic1] > val:
+          i_swap = ic1
+        else:
+          break
+      elif heap_rdist[ic1] >= heap_rdist[ic2]:
+        if val < heap_rdist[ic1]:
+          i_swap = ic1
+        else:
+          break
+      else:
+        if val < heap_rdist[ic2]:
+          i_swap = ic2
+        else:
+          break
+      heap_rdist[i] = heap_rdist[i_swap]
+      heap_ind[i] = heap_ind[i_swap]
+      i = i_swap
+    heap_rdist[i] = val
+    heap_ind[i] = i_val
+    return
+
+  def __simultaneous_sort(self, dist, idx):
+    # sklearn _simultaneous_sort: in-place quicksort of dist and idx views
+    size = len(dist)
+    def swap(i, j):
+      dist[i], dist[j] = dist[j], dist[i]
+      idx[i], idx[j] = idx[j], idx[i]
+
+    if size <= 1:
+      return
+    elif size == 2:
+      if dist[0] > dist[1]:
+        swap(0, 1)
+    elif size == 3:
+      if dist[0] > dist[1]:
+        swap(0, 1)
+      if dist[1] > dist[2]:
+        swap(1, 2)
+        if dist[0] > dist[1]:
+          swap(0, 1)
+    else:
+      pivot_idx = size // 2
+      if dist[0] > dist[size - 1]:
+        swap(0, size - 1)
+      if dist[size - 1] > dist[pivot_idx]:
+        swap(size - 1, pivot_idx)
+        if dist[0] > dist[size - 1]:
+          swap(0, size - 1)
+      pivot_val = dist[size - 1]
+      store_idx = 0
+      for i in range(size - 1):
+        if dist[i] < pivot_val:
+          swap(i, store_idx)
+          store_idx += 1
+      swap(store_idx, size - 1)
+      pivot_idx = store_idx
+      if pivot_idx > 1:
+        self.__simultaneous_sort(dist[:pivot_idx], idx[:pivot_idx])
+      if pivot_idx + 2 < size:
+        self.__simultaneous_sort(dist[pivot_idx + 1:], idx[pivot_idx + 1:])
+    return
+
+  def predict(self, X):
+    X = np.atleast_2d(np.asarray(X, dtype = float))
+    y_pred = np.empty(len(X))
+    for start in range(0, len(X), self.ROW_CHUNK):
+      neigh_dist, neigh_ind = self.kneighbors(X[start : start + self.ROW_CHUNK])
+
+      # Training points at zero distance get weight 1, others 0
+      with np.errstate(divide = 'ignore'):
+        weights = 1. / neigh_dist
+      inf_mask = np.isinf(weights)
+      inf_row = np.any(inf_mask, axis = 1)
+      weights[inf_row] = inf_mask[inf_row]
+
+      num = np.sum(self.y[neigh_ind] * weights, axis = 1)
+      denom = np.sum(weights, axis = 1)
+      y_pred[start : start + self.ROW_CHUNK] = num / denom
+    return y_pred
+
+##
+# Private sequence featurization
+##
+# 2-bit base codes. Padding codes never match each other or a base.
+BASE_CODES = np.full(256, 255, dtype = np.uint8)
+for code, base in enumerate('ACGT'):
+  BASE_CODES[ord(base)] = code
+LEFT_PAD_CODE = 4
+RIGHT_PAD_CODE = 5
+
+def __encode_seq(seq):
+  return BASE_CODES[np.frombuffer(seq.encode('ascii'), dtype = np.uint8)]
+
+def __featurize_windows(windows, cutsite, max_del_lens):
+  # Featurizes MH deletions for many windows at once.
+  #   windows: (N x W) uint8 array of base codes, all cut at index cutsite
+  #   max_del_lens: (N,) longest deletion length allowed per window
+  #
+  # For deletion length dl, position i of the left flank
+  # seq[cutsite - dl + i] is compared to position i of the right flank
+  # seq[cutsite + i]: these are equality diagonals of the window.
+  # Maximal runs of matches are microhomologies.
+  #
+  # Returns arrays (site_idxs, mh_lens, gc_counts, gt_poss, del_lens)
+  # ordered by site, then deletion length, then position.
+  num_dls = DELLEN_LIMIT - 1
+  dls = np.arange(1, DELLEN_LIMIT).reshape(-1, 1)
+  poss = np.arange(num_dls).reshape(1, -1)
+  left_idxs = np.clip(cutsite - dls + poss, 0, windows.shape[1] - 1)
+  right_idxs = np.clip(cutsite + poss, 0, windows.shape[1] - 1)
+  valid = (poss < dls)[np.newaxis, :, :] & (dls.reshape(1, -1, 1) <= np.asarray(max_del_lens).reshape(-1, 1, 1))
+
+  eq = (windows[:, left_idxs] == windows[:, right_idxs]) & valid
+  prev_eq = np.zeros(eq.shape, dtype = bool)
+  prev_eq[:, :, 1:] = eq[:, :, :-1]
+  next_eq = np.zeros(eq.shape, dtype = bool)
+  next_eq[:, :, :-1] = eq[:, :, 1:]
+
+  site_idxs, dl_idxs, run_starts = np.nonzero(eq & ~prev_eq)
+  run_ends = np.nonzero(eq & ~next_eq)[2]
+  mh_lens = run_ends - run_starts + 1
+  gt_poss = run_ends + 1
+  del_lens = dl_idxs + 1
+
+  # GC content of each MH from prefix sums
+  is_gc = (windows == BASE_CODES[ord('C')]) | (windows == BASE_CODES[ord('G')])
+  gc_cumsum = np.zeros((windows.shape[0], windows.shape[1] + 1), dtype = int)
+  gc_cumsum[:, 1:] = np.cumsum(is_gc, axis = 1)
+  mh_starts = cutsite - del_lens + run_starts
+  gc_counts = gc_cumsum[site_idxs, mh_starts + mh_lens] - gc_cumsum[site_idxs, mh_starts]
+  return site_idxs, mh_lens, gc_counts, gt_poss, del_lens
+
+def __featurize_window_batch(seqs, cutsites):
+  # Stacks a window of +/- DELLEN_LIMIT bp around each cutsite,
+  # padding past the sequence ends, and featurizes all at once.
+  radius = DELLEN_LIMIT
+  windows = np.empty((len(seqs), 2 * radius), dtype = np.uint8)
+  max_del_lens = np.empty(len(seqs), dtype = int)
+  encoded = dict()
+  for idx, (seq, cutsite) in enumerate(zip(seqs, cutsites)):
+    if seq not in encoded:
+      encoded[seq] = __encode_seq(seq)
+    codes = encoded[seq]
+    start, end = max(cutsite - radius, 0), min(cutsite + radius, len(seq))
+    windows[idx, : radius] = LEFT_PAD_CODE
+    windows[idx, radius :] = RIGHT_PAD_CODE
+    windows[idx, start - cutsite + radius : end - cutsite + radius] = codes[start : end]
+    max_del_lens[idx] = min(DELLEN_LIMIT - 1, cutsite, len(seq) - cutsite)
+  return __featurize_windows(windows, radius, max_del_lens)
+
+def __featurize_tiles(seq, cutsites):
+  # Featurizes MH deletions for many cutsites in one sequence.
+  # Returns the same arrays as __featurize_windows, with site_idxs
+  # indexing into cutsites.
+  #
+  # The equality diagonal for deletion length dl, seq[j] == seq[j + dl],
+  # is shared by every cutsite: a cutsite's flanks compare its slice
+  # j in [cutsite - dl, cutsite). Runs of matches are found once per
+  # diagonal over the region spanned by all cutsites, then clipped
+  # to each cutsite's slice.
+  cutsites = np.asarray(cutsites, dtype = int)
+  max_del_lens = np.minimum(np.minimum(DELLEN_LIMIT - 1, cutsites), len(seq) - cutsites)
+  active = np.nonzero(max_del_lens > 0)[0]
+  outputs = []
+  if len(active) > 0:
+    # Crop to the region the cutsites can reach
+    offset = int(np.min(cutsites[active] - max_del_lens[active]))
+    end = int(np.max(cutsites[active] + max_del_lens[active]))
+    codes = __encode_seq(seq[offset : end])
+    gc_cumsum = np.zeros(len(codes) + 1, dtype = int)
+    gc_cumsum[1:] = np.cumsum((codes == BASE_CODES[ord('C')]) | (codes == BASE_CODES[ord('G')]))
+    local_cutsites = cutsites - offset
+
+  for dl in range(1, DELLEN_LIMIT):
+    act_idxs = np.nonzero(max_del_lens[active] >= dl)[0]
+    if len(act_idxs) == 0:
+      break
+    eq = codes[:-dl] == codes[dl:]
+    prev_eq = np.zeros(eq.shape, dtype = bool)
+    prev_eq[1:] = eq[:-1]
+    next_eq = np.zeros(eq.shape, dtype = bool)
+    next_eq[:-1] = eq[1:]
+    starts = np.nonzero(eq & ~prev_eq)[0]
+    ends = np.nonzero(eq & ~next_eq)[0]
+
+    # Runs overlapping each cutsite's slice [lo, hi)
+    his = local_cutsites[active[act_idxs]]
+    los = his - dl
+    firsts = np.searchsorted(ends, los, side = 'left')
+    counts = np.maximum(np.searchsorted(starts, his, side = 'left') - firsts, 0)
+    group_starts = np.cumsum(counts) - counts
+    run_sites = np.repeat(np.arange(len(act_idxs)), counts)
+    run_ranks = np.arange(len(run_sites)) - group_starts[run_sites]
+    run_idxs = firsts[run_sites] + run_ranks
+
+    run_los = los[run_sites]
+    mh_starts = np.maximum(starts[run_idxs], run_los)
+    mh_ends = np.minimum(ends[run_idxs], his[run_sites] - 1)
+    outputs.append((dl, act_idxs, counts, run_sites, run_ranks, mh_starts, mh_ends, run_los))
+
+  # Scatter into one block ordered by site, then deletion length, then position
+  dl_counts = np.zeros((len(active), DELLEN_LIMIT), dtype = int)
+  for dl, act_idxs, counts, _, _, _, _, _ in outputs:
+    dl_counts[act_idxs, dl] = counts
+  group_offsets = (np.cumsum(dl_counts) - dl_counts.ravel()).reshape(dl_counts.shape)
+  total = int(np.sum(dl_counts))
+  site_idxs = np.empty(total, dtype = int)
+  mh_lens = np.empty(total, dtype = int)
+  gc_counts = np.empty(total, dtype = int)
+  gt_poss = np.empty(total, dtype = int)
+  del_lens = np.empty(total, dtype = int)
+  for dl, act_idxs, counts, run_sites, run_ranks, mh_starts, mh_ends, run_los in outputs:
+    dest = group_offsets[act_idxs[run_sites], dl] + run_ranks
+    site_idxs[dest] = active[act_idxs[run_sites]]
+    mh_lens[dest] = mh_ends - mh_starts + 1
+    gc_counts[dest] = gc_cumsum[mh_ends + 1] - gc_cumsum[mh_starts]
+    gt_poss[dest] = mh_ends - run_los + 1
+    del_lens[dest] = dl
+  return site_idxs, mh_lens, gc_counts, gt_poss, del_lens
+
+# Sequences with at least this many cutsites are tiled
+TILE_MIN_SITES = 64
+
+def __featurize_batch(seqs, cutsites):
+  # Featurizes MH deletions for many (seq, cutsite) pairs.
+  # Cutsites sharing a sequence are tiled when there are many of them,
+  # the rest are featurized as independent windows.
+  # Returns the same arrays as __featurize_windows.
+  groups = defaultdict(list)
+  for idx, seq in enumerate(seqs):
+    groups[seq].append(idx)
+  tiled = [(seq, idxs) for seq, idxs in groups.items() if len(idxs) >= TILE_MIN_SITES]
+  if len(tiled) == 0:
+    return __featurize_window_batch(seqs, cutsites)
+  if len(tiled) == 1 and len(tiled[0][1]) == len(seqs):
+    return __featurize_tiles(seqs[0], cutsites)
+
+  parts = []
+  for seq, idxs in tiled:
+    part = __featurize_tiles(seq, [cutsites[idx] for idx in idxs])
+    parts.append((np.array(idxs)[part[0]],) + part[1:])
+  tiled_idxs = set(idx for seq, idxs in tiled for idx in idxs)
+  idxs = np.array([idx for idx in range(len(seqs)) if idx not in tiled_idxs], dtype = int)
+  if len(idxs) > 0:
+    part = __featurize_window_batch([seqs[idx] for idx in idxs], [cutsites[idx] for idx in idxs])
+    parts.append((idxs[part[0]],) + part[1:])
+
+  arrays = [np.concatenate(arrs) for arrs in zip(*parts)]
+  order = np.argsort(arrays[0], kind = 'stable')
+  return tuple(arr[order] for arr in arrays)
+
+def __featurize(seq, cutsite):
+  site_idxs, mh_lens, gc_counts, gt_poss, del_lens = __featurize_batch([seq], [cutsite])
+  gc_fracs = gc_counts / mh_lens
+  return mh_lens, gc_fracs, gt_poss, del_lens
+
+##
+# Error catching
+##
+def __find_seq_error(seq):
+  for c in set(seq):
+    if c not in list('ACGT'):
+      return True, 'Only ACGT characters allowed: Bad character %s' % (c)
+  return False, ''
+
+def error_catching(seq, cutsite, checked_seqs = None):
+  # checked_seqs: optional set of sequences already found to be valid.
+  # It is updated in place, so a batch checks each sequence once.
+  #
+  # Type errors
+  if type(seq) != str:
+    return True, 'Sequence is not a string.'
+  if type(cutsite) != int:
+    return True, 'Cutsite is not an int.'
+  
+  # Cutsite bounds errors
+  if cutsite < 1 or cutsite > len(seq) - 1:
+    return True, 'Cutsite index is not within the sequence. Cutsite must be an integer between index 1 and len(seq) - 1, inclusive.'
+
+  # Sequence string errors
+  if checked_seqs is None or seq not in checked_seqs:
+    flag, error = __find_seq_error(seq)
+    if flag:
+      return flag, error
+    if checked_seqs is not None:
+      checked_seqs.add(seq)
+
+
+  return False, ''
+
+def provide_warnings(seq, cutsite):
+  if len(seq) <= 10:
+    print('Warning: Sequence length is very short (%s bp)' % (len(seq)))
+  return
+
+##
+# Prediction results
+##
+CATEGORY_PAD = -1
+CATEGORY_DEL = 0
+CATEGORY_INS = 1
+CATEGORY_NAMES = ['del', 'ins']
+MHLESS_GT_POS = -1
+NO_INS_BASE = -1
+
+class PredictionResult:
+  # Columnar repair outcome predictions for one site. Each attribute
+  # is a NumPy array with one entry per outcome:
+  #   length    deletion or insertion length
+  #   gt_pos    genotype position, MHLESS_GT_POS for MH-less deletions
+  #   mh_len    microhomology length, 0 for MH-less deletions and insertions
+  #   category  CATEGORY_DEL or CATEGORY_INS
+  #   ins_base  2-bit code of the inserted base, NO_INS_BASE for deletions
+  #   freq      predicted frequency
+  __slots__ = ('length', 'gt_pos', 'mh_len', 'category', 'ins_base', 'freq')
+
+  def __init__(self, length, gt_pos, mh_len, category, ins_base, freq):
+    self.length = np.asarray(length, dtype = np.int64)
+    self.gt_pos = np.asarray(gt_pos, dtype = np.int64)
+    self.mh_len = np.asarray(mh_len, dtype = np.int64)
+    self.category = np.asarray(category, dtype = np.int8)
+    self.ins_base = np.asarray(ins_base, dtype = np.int8)
+    self.freq = np.asarray(freq, dtype = np.float64)
+    return
+
+  def __len__(self):
+    return len(self.freq)
+
+  def del_mask(self):
+    return self.category == CATEGORY_DEL
+
+  def ins_mask(self):
+    return self.category == CATEGORY_INS
+
+  def mh_del_mask(self):
+    return (self.category == CATEGORY_DEL) & (self.gt_pos != MHLESS_GT_POS)
+
+  def mhless_del_mask(self):
+    return (self.category == CATEGORY_DEL) & (self.gt_pos == MHLESS_GT_POS)
+
+  def to_dataframe(self):
+    # Same columns and values as the pred_df returned by predict()
+    is_ins = self.ins_mask()
+    gt_pos = self.gt_pos.astype(object)
+    gt_pos[self.gt_pos == MHLESS_GT_POS] = 'e'
+    gt_pos[is_ins] = np.nan
+    mh_len = self.mh_len.astype(float)
+    mh_len[is_ins] = np.nan
+    ins_base = np.array(list('ACGT'), dtype = object)[np.maximum(self.ins_base, 0)]
+    ins_base[~is_ins] = np.nan
+    return pd.DataFrame({
+      'Length': self.length,
+      'Genotype position': gt_pos,
+      'Predicted frequency': self.freq,
+      'Microhomology length': mh_len,
+      'Category': np.array(CATEGORY_NAMES, dtype = object)[self.category],
+      'Inserted Bases': ins_base,
+    })
+
+  @classmethod
+  def from_dataframe(cls, pred_df):
+    is_ins = np.asarray(pred_df['Category'] == 'ins')
+    gt_pos = [MHLESS_GT_POS if ins or gt == 'e' else int(gt) for ins, gt in zip(is_ins, pred_df['Genotype position'])]
+    if 'Inserted Bases' in pred_df.columns:
+      ins_base = [BASE_CODES[ord(b)] if ins else NO_INS_BASE for ins, b in zip(is_ins, pred_df['Inserted Bases'])]
+    else:
+      ins_base = [NO_INS_BASE] * len(pred_df)
+    return cls(
+      pred_df['Length'],
+      gt_pos,
+      np.nan_to_num(np.asarray(pred_df['Microhomology length'], dtype = float)),
+      is_ins.astype(np.int8) * CATEGORY_INS,
+      ins_base,
+      pred_df['Predicted frequency'],
+    )
+
+def __as_result(pred):
+  if isinstance(pred, PredictionResult):
+    return pred
+  return PredictionResult.from_dataframe(pred)
+
+##
+# Private prediction methods
+##
+def __predict_dels(seq, cutsite):
+  del_results, total_phi_scores = __predict_dels_batch([seq], [cutsite])
+  return del_results[0], total_phi_scores[0]
+
+def __predict_dels_batch(seqs, cutsites):
+  ################################################################
+  #####
+  ##### Predict MH and MH-less deletions
+  #####
+  # Featurize all sites, then look up MH scores for the
+  # concatenated (ragged) batch of MH features at once
+  site_idxs, all_mh_len, all_gc_count, all_gt_pos, all_del_len = __featurize_batch(seqs, cutsites)
+  offsets = np.concatenate([[0], np.cumsum(np.bincount(site_idxs, minlength = len(seqs)))])
+  all_mh_scores = nn_table[all_mh_len, all_gc_count]
+
+  # MH-less scores depend only on deletion length
+  mhless_dls = np.arange(1, DELLEN_LIMIT)
+  mhless_scores = nn2_table[mhless_dls]
+  mhless_unfq = np.exp(mhless_scores - 0.25*mhless_dls)
+
+  del_results, total_phi_scores = [], []
+  for idx in range(len(seqs)):
+    site = slice(offsets[idx], offsets[idx + 1])
+    mh_scores = all_mh_scores[site]
+    mh_vector = all_mh_len[site]
+    del_lens = all_del_len[site]
+    unfq = np.exp(mh_scores - 0.25*del_lens)
+
+    # Add MH-less contribution at full MH deletion lengths
+    full_crit = (del_lens == mh_vector)
+    unfq[full_crit] += mhless_unfq[del_lens[full_crit] - 1]
+
+    # Include MH-less contributions at non-full MH deletion lengths
+    nonfull_dls = np.setdiff1d(mhless_dls, del_lens[full_crit])
+    unfq = np.concatenate([unfq, mhless_unfq[nonfull_dls - 1]])
+
+    total_phi_score = float(np.sum(unfq))
+    num_mhless = len(nonfull_dls)
+    del_results.append(PredictionResult(
+      np.concatenate([del_lens, nonfull_dls]),
+      np.concatenate([all_gt_pos[site], np.full(num_mhless, MHLESS_GT_POS)]),
+      np.concatenate([mh_vector, np.zeros(num_mhless, dtype = int)]),
+      np.full(len(unfq), CATEGORY_DEL),
+      np.full(len(unfq), NO_INS_BASE),
+      unfq / np.sum(unfq),
+    ))
+    total_phi_scores.append(total_phi_score)
+  return del_results, total_phi_scores
+
+def __predict_ins(seq, cutsite, del_result, total_phi_score, celltype):
+  results = __predict_ins_batch([seq], [cutsite], [del_result], [total_phi_score], celltype)
+  return results[0]
+
+def __get_onebp_features_batch(seqs, cutsites, del_results, total_phi_scores, celltype):
+  # Normalized (N x 10) features for the 1-bp insertion rate model:
+  # one-hot bases at -1 and 0, precision of the 1-28 bp deletion
+  # length distribution, and log phi
+  num_sites = len(seqs)
+  site_idxs = np.repeat(np.arange(num_sites), [len(del_result) for del_result in del_results])
+  lengths = np.concatenate([del_result.length for del_result in del_results])
+  freqs = np.concatenate([del_result.freq for del_result in del_results])
+  in_range = lengths <= 28
+  dlpred = np.bincount(site_idxs[in_range] * (28+1) + lengths[in_range], weights = freqs[in_range], minlength = num_sites * (28+1))
+  dlpred = dlpred.reshape(num_sites, 28+1)[:, 1 : 28+1]
+  dlpred = dlpred / np.sum(dlpred, axis = 1, keepdims = True)
+
+  # Entropy as in scipy.stats.entropy, one row per site
+  pk = dlpred / np.sum(dlpred, axis = 1, keepdims = True)
+  norm_entropy = np.sum(entr(pk), axis = 1) / np.log(dlpred.shape[1])
+  precision = 1 - norm_entropy
+  log_phi_scores = np.log(np.asarray(total_phi_scores, dtype = float))
+
+  onehot = np.eye(4)
+  fivebases = __encode_seq(''.join(seq[cutsite - 1] for seq, cutsite in zip(seqs, cutsites)))
+  threebases = __encode_seq(''.join(seq[cutsite] for seq, cutsite in zip(seqs, cutsites)))
+  onebp_features = np.concatenate([onehot[fivebases], onehot[threebases], precision.reshape(-1, 1), log_phi_scores.reshape(-1, 1)], axis = 1)
+  return (onebp_features - normalizer[celltype][:, 0]) / normalizer[celltype][:, 1]
+
+def __predict_ins_batch(seqs, cutsites, del_results, total_phi_scores, celltype):
+  ################################################################
+  #####
+  ##### Predict Insertions
+  #####
+  # Predict 1 bp insertions with one rate model call for all sites
+  onebp_features = __get_onebp_features_batch(seqs, cutsites, del_results, total_phi_scores, celltype)
+  rates_1bpins = np.asarray(rate_model[celltype].predict(onebp_features), dtype = float).flatten()
+
+  # Predict 1 bp genotype frequencies for all sites with one lookup
+  if celltype in ['mESC', 'U2OS']:
+    contexts = [seq[cutsite - 2] + seq[cutsite - 1] + seq[cutsite] for seq, cutsite in zip(seqs, cutsites)]
+  elif celltype in ['K562', 'HEK293', 'HCT116']:
+    contexts = [seq[cutsite - 1] for seq, cutsite in zip(seqs, cutsites)]
+  context_codes = np.array([__encode_seq(context) for context in contexts]).reshape(len(seqs), -1)
+  ins_bases = bp_ins_codes[celltype]
+  all_ins_freqs = bp_model[celltype][tuple(context_codes.T)][:, ins_bases]
+  all_ins_freqs *= (rates_1bpins / (1 - rates_1bpins))[:, None]
+
+  results = []
+  for seq, cutsite, del_result, ins_freqs in zip(seqs, cutsites, del_results, all_ins_freqs):
+    num_ins = len(ins_bases)
+    freq = np.concatenate([del_result.freq, ins_freqs])
+    results.append(PredictionResult(
+      np.concatenate([del_result.length, np.ones(num_ins, dtype = int)]),
+      np.concatenate([del_result.gt_pos, np.full(num_ins, MHLESS_GT_POS)]),
+      np.concatenate([del_result.mh_len, np.zeros(num_ins, dtype = int)]),
+      np.concatenate([del_result.category, np.full(num_ins, CATEGORY_INS)]),
+      np.concatenate([del_result.ins_base, ins_bases]),
+      freq / np.sum(freq),
+    ))
+  return results
+
+##
+# Statistics kernel
+##
+def __stack_results(results):
+  # Pads a list of PredictionResults into (N x K) arrays.
+  # Padding entries have category CATEGORY_PAD and zero frequency.
+  num_outcomes = max([len(result) for result in results])
+  shape = (len(results), num_outcomes)
+  length = np.zeros(shape, dtype = np.int64)
+  gt_pos = np.full(shape, MHLESS_GT_POS, dtype = np.int64)
+  category = np.full(shape, CATEGORY_PAD, dtype = np.int8)
+  ins_base = np.full(shape, NO_INS_BASE, dtype = np.int8)
+  freq = np.zeros(shape)
+  for idx, result in enumerate(results):
+    n = len(result)
+    length[idx, :n] = result.length
+    gt_pos[idx, :n] = result.gt_pos
+    category[idx, :n] = result.category
+    ins_base[idx, :n] = result.ins_base
+    freq[idx, :n] = result.freq
+  return length, gt_pos, category, ins_base, freq
+
+def __stats_kernel(length, gt_pos, category, ins_base, freq):
+  # Computes all summary statistics for N sites in one pass.
+  # Inputs are (N x K) outcome arrays as made by __stack_results.
+  #
+  # Frequencies are binned by (site, outcome class, length) with a
+  # single bincount, where the outcome classes are MH deletion,
+  # MH-less deletion and insertion. Every per-length, frame and
+  # category total is a reduction of that tensor.
+  #
+  # Returns a dict of arrays with first dimension N.
+  num_sites = freq.shape[0]
+  max_len = max(int(np.max(length)) + 1, DELLEN_LIMIT)
+  is_valid = (category != CATEGORY_PAD)
+  is_del = (category == CATEGORY_DEL)
+  is_ins = (category == CATEGORY_INS)
+
+  outcome_class = np.where(is_ins, 2, np.where(gt_pos == MHLESS_GT_POS, 1, 0))
+  site_idxs = np.arange(num_sites).reshape(-1, 1)
+  keys = (site_idxs * 3 + outcome_class) * max_len + length
+  binned = np.bincount(keys[is_valid], weights = freq[is_valid], minlength = num_sites * 3 * max_len)
+  binned = binned.reshape(num_sites, 3, max_len)
+  mh_length_fqs, mhless_length_fqs, ins_length_fqs = binned[:, 0], binned[:, 1], binned[:, 2]
+  length_fqs = mh_length_fqs + mhless_length_fqs
+
+  ins_keys = site_idxs * 4 + np.maximum(ins_base, 0)
+  ins_base_fqs = np.bincount(ins_keys[is_ins], weights = freq[is_ins], minlength = num_sites * 4)
+  ins_base_fqs = ins_base_fqs.reshape(num_sites, 4)
+
+  # Frames: deletions shift by -length mod 3, 1-bp insertions by +1
+  ins_fq = ins_length_fqs.sum(axis = 1)
+  frame_of_len = (-1 * np.arange(max_len)) % 3
+  frame_fqs = np.zeros((num_sites, 3))
+  for frame in range(3):
+    frame_fqs[:, frame] = length_fqs[:, frame_of_len == frame].sum(axis = 1)
+  frame_fqs[:, 1] += ins_fq
+
+  lens = np.arange(max_len)
+  expected_indel_len = (binned * lens).sum(axis = (1, 2)) / 100
+
+  # Precision from normalized entropy over all outcomes
+  num_outcomes = is_valid.sum(axis = 1)
+  probs = freq / freq.sum(axis = 1, keepdims = True)
+  plogp = np.where(probs > 0, probs * np.log(np.where(probs > 0, probs, 1)), 0)
+  precision = 1 + plogp.sum(axis = 1) / np.log(num_outcomes)
+
+  masked = np.where(is_valid, freq, -np.inf)
+  return {
+    'length_fqs': length_fqs,
+    'mh_length_fqs': mh_length_fqs,
+    'mhless_length_fqs': mhless_length_fqs,
+    'ins_base_fqs': ins_base_fqs,
+    'ins_fq': ins_fq,
+    'mhdel_fq': mh_length_fqs.sum(axis = 1),
+    'mhless_fq': mhless_length_fqs.sum(axis = 1),
+    'frame_fqs': frame_fqs,
+    'expected_indel_len': expected_indel_len,
+    'precision': precision,
+    'highest_fq': masked.max(axis = 1),
+    'highest_del_fq': np.where(is_del, freq, -np.inf).max(axis = 1),
+    'highest_ins_fq': np.where(is_ins, freq, -np.inf).max(axis = 1),
+  }
+
+def get_stats_arrays(results):
+  # Summary statistics for a list of PredictionResults (or pred_dfs)
+  # as a dict of arrays, one entry per site.
+  return __stats_kernel(*__stack_results([__as_result(res) for res in results]))
+
+def __build_stats(seq, cutsite, result, total_phi_score, celltype, kernel = None, idx = 0):
+  # kernel and idx select a row of precomputed __stats_kernel output
+  if kernel is None:
+    kernel = __stats_kernel(*__stack_results([result]))
+  frame_fqs = kernel['frame_fqs'][idx]
+
+  stats = {'Phi': total_phi_score,
+           'Precision': float(kernel['precision'][idx]),
+           '1-bp ins frequency': float(kernel['ins_fq'][idx]),
+           'MH del frequency': float(kernel['mhdel_fq'][idx]),
+           'MHless del frequency': float(kernel['mhless_fq'][idx]),
+           'Frameshift frequency': float(frame_fqs[1] + frame_fqs[2]),
+           'Frame +0 frequency': float(frame_fqs[0]), 
+           'Frame +1 frequency': float(frame_fqs[1]), 
+           'Frame +2 frequency': float(frame_fqs[2]), 
+           'Highest outcome frequency': float(kernel['highest_fq'][idx]),
+           'Highest del frequency': float(kernel['highest_del_fq'][idx]),
+           'Highest ins frequency': float(kernel['highest_ins_fq'][idx]),
+           'Expected indel length': float(kernel['expected_indel_len'][idx]),
+           'Reference sequence': seq,
+           'Cutsite': cutsite,
+           'gRNA': seq[cutsite - 18 : cutsite + 3],
+           'gRNA orientation': '+',
+           'Celltype': celltype,
+          }
+  return stats
+
+##
+# Main public-facing prediction
+##
+def predict(seq, cutsite, celltype, as_dataframe = True):
+  # Predict 1 bp insertions and all deletions (MH and MH-less)
+  #
+  # If no errors, returns a tuple (pred_df, stats)
+  # where pred_df is a dataframe and stats is a dict.
+  # With as_dataframe = False, pred_df is a PredictionResult instead.
+  #  
+  # If errors, returns a string
+  #
+  if init_flag == False:
+    init_model()
+  init_celltype(celltype)
+
+  # Sanitize input
+  seq = seq.upper()
+  flag, error = error_catching(seq, cutsite)
+  if flag:
+    return error
+  provide_warnings(seq, cutsite)
+
+
+  # Make predictions
+  del_result, total_phi_score = __predict_dels(seq, cutsite)
+  result = __predict_ins(seq, cutsite, del_result, total_phi_score, celltype)
+  result.freq *= 100
+
+  # Build stats
+  stats = __build_stats(seq, cutsite, result, total_phi_score, celltype)
+  
+  if as_dataframe:
+    return result.to_dataframe(), stats
+  return result, stats
+
+def predict_batch(seqs, cutsites, celltype, as_dataframe = True):
+  # Predict many (seq, cutsite) pairs at once.
+  # Featurization is per site, but the MH and MH-less networks and the
+  # 1-bp insertion rate model each run once over the whole batch.
+  #
+  # Returns a list aligned with the input: each item is a tuple
+  # (pred_df, stats) equivalent to predict(seq, cutsite, celltype),
+  # or an error string for invalid inputs.
+  #
+  results = predict_batch_all_celltypes(seqs, cutsites, celltypes = [celltype], as_dataframe = as_dataframe)
+  return [res if type(res) == str else res[celltype] for res in results]
+
+def predict_all_celltypes(seq, cutsite, celltypes = None, as_dataframe = True):
+  # Predict one (seq, cutsite) pair in several cell types.
+  # Deletions do not depend on cell type, so they are predicted once
+  # and only the 1-bp insertion step is repeated per cell type.
+  #
+  # If no errors, returns a dict: celltype -> (pred_df, stats)
+  # If errors, returns a string
+  #
+  return predict_batch_all_celltypes([seq], [cutsite], celltypes = celltypes, as_dataframe = as_dataframe)[0]
+
+def predict_batch_all_celltypes(seqs, cutsites, celltypes = None, as_dataframe = True):
+  # Batched version of predict_all_celltypes. Defaults to all cell types.
+  #
+  # Returns a list aligned with the input: each item is a dict
+  # celltype -> (pred_df, stats), or an error string for invalid inputs.
+  #
+  if init_flag == False:
+    init_model()
+  if celltypes is None:
+    celltypes = CELLTYPES
+  for celltype in celltypes:
+    init_celltype(celltype)
+
+  results = [None] * len(seqs)
+  valid_idxs, valid_seqs, valid_cutsites = [], [], []
+  upper_seqs, checked_seqs = dict(), set()
+  for idx, (seq, cutsite) in enumerate(zip(seqs, cutsites)):
+    if type(seq) == str:
+      if seq not in upper_seqs:
+        upper_seqs[seq] = seq.upper()
+      seq = upper_seqs[seq]
+    flag, error = error_catching(seq, cutsite, checked_seqs = checked_seqs)
+    if flag:
+      results[idx] = error
+      continue
+    provide_warnings(seq, cutsite)
+    valid_idxs.append(idx)
+    valid_seqs.append(seq)
+    valid_cutsites.append(cutsite)
+    results[idx] = dict()
+
+  if len(valid_idxs) == 0:
+    return results
+
+  # Make predictions
+  del_results, total_phi_scores = __predict_dels_batch(valid_seqs, valid_cutsites)
+  for celltype in celltypes:
+    ct_results = __predict_ins_batch(valid_seqs, valid_cutsites, del_results, total_phi_scores, celltype)
+    for result in ct_results:
+      result.freq *= 100
+    kernel = __stats_kernel(*__stack_results(ct_results))
+
+    for jdx, idx in enumerate(valid_idxs):
+      result = ct_results[jdx]
+      stats = __build_stats(valid_seqs[jdx], valid_cutsites[jdx], result, total_phi_scores[jdx], celltype, kernel = kernel, idx = jdx)
+      if as_dataframe:
+        result = result.to_dataframe()
+      results[idx][celltype] = (result, stats)
+  return results
+
+##
+# PAM-agnostic scan
+##
+SCAN_FLANK = 30
+SCAN_STATS_COLUMNS = [
+  'Phi',
+  'Precision',
+  '1-bp ins frequency',
+  'MH del frequency',
+  'MHless del frequency',
+  'Frameshift frequency',
+  'Frame +0 frequency',
+  'Frame +1 frequency',
+  'Frame +2 frequency',
+  'Highest outcome frequency',
+  'Highest del frequency',
+  'Highest ins frequency',
+  'Expected indel length',
+]
+REVCOMP_TABLE = str.maketrans('ACGT', 'TGCA')
+
+def __stats_matrix(kernel, total_phi_scores):
+  # Stats as in __build_stats for all sites, columns in SCAN_STATS_COLUMNS order
+  frame_fqs = kernel['frame_fqs']
+  columns = [
+    np.asarray(total_phi_scores, dtype = float),
+    kernel['precision'],
+    kernel['ins_fq'],
+    kernel['mhdel_fq'],
+    kernel['mhless_fq'],
+    frame_fqs[:, 1] + frame_fqs[:, 2],
+    frame_fqs[:, 0],
+    frame_fqs[:, 1],
+    frame_fqs[:, 2],
+    kernel['highest_fq'],
+    kernel['highest_del_fq'],
+    kernel['highest_ins_fq'],
+    kernel['expected_indel_len'],
+  ]
+  return np.stack(columns, axis = 1).astype(float)
+
+def scan_all_cutsites(seq, celltypes = None, flank = SCAN_FLANK):
+  # Predicts every cutsite at positions flank .. len(seq) - flank - 1
+  # on both strands, like batch mode with a PAM of all N.
+  # Featurization is tiled over each strand and every model runs once
+  # per cell type, so only summary statistics are kept.
+  #
+  # If no errors, returns a tuple (sites, stats) where
+  #   sites is a dataframe: gRNA orientation, Local cutsite (on the
+  #     gRNA's strand) and Cutsite (on the + strand)
+  #   stats is a dict: celltype -> (num_sites x len(SCAN_STATS_COLUMNS)) array
+  # If errors, returns a string
+  #
+  if init_flag == False:
+    init_model()
+  if celltypes is None:
+    celltypes = CELLTYPES
+  for celltype in celltypes:
+    init_celltype(celltype)
+
+  if type(seq) != str:
+    return 'Sequence is not a string.'
+  seq = seq.upper()
+  flag, error = __find_seq_error(seq)
+  if flag:
+    return error
+
+  rc_seq = seq[::-1].translate(REVCOMP_TABLE)
+  local_cutsites = np.arange(flank, len(seq) - flank)
+  num_strand_sites = len(local_cutsites)
+  sites = pd.DataFrame({
+    'gRNA orientation': ['+'] * num_strand_sites + ['-'] * num_strand_sites,
+    'Local cutsite': np.concatenate([local_cutsites, local_cutsites]),
+    'Cutsite': np.concatenate([local_cutsites, len(seq) - local_cutsites]),
+  })
+  stats = dict()
+  if num_strand_sites == 0:
+    for celltype in celltypes:
+      stats[celltype] = np.zeros((0, len(SCAN_STATS_COLUMNS)))
+    return sites, stats
+
+  seqs = [seq] * num_strand_sites + [rc_seq] * num_strand_sites
+  cutsites = [int(cutsite) for cutsite in sites['Local cutsite']]
+  del_results, total_phi_scores = __predict_dels_batch(seqs, cutsites)
+  for celltype in celltypes:
+    results = __predict_ins_batch(seqs, cutsites, del_results, total_phi_scores, celltype)
+    for result in results:
+      result.freq *= 100
+    kernel = __stats_kernel(*__stack_results(results))
+    stats[celltype] = __stats_matrix(kernel, total_phi_scores)
+  return sites, stats
+
+##
+# Process predictions
+##
+def get_frameshift_fqs(pred_df):
+  # Accepts a pred_df or a PredictionResult.
+  # Returns a dataframe
+  #   - Frame
+  #   - Predicted frequency
+  #
+  kernel = get_stats_arrays([pred_df])
+  d = defaultdict(list)
+  d['Frame'] = ['+0', '+1', '+2']
+  d['Predicted frequency'] = list(kernel['frame_fqs'][0])
+  df = pd.DataFrame(d)
+  return df
+
+def get_indel_length_fqs(pred_df):
+  # Accepts a pred_df or a PredictionResult.
+  # Returns a dataframe
+  #   - Indel length
+  #   - Predicted frequency
+  result = __as_result(pred_df)
+  kernel = get_stats_arrays([result])
+  del_lens = np.unique(result.length)
+
+  d = defaultdict(list)
+  d['Indel length'] = ['+1'] + ['-%s' % (del_len) for del_len in del_lens]
+  d['Predicted frequency'] = [kernel['ins_fq'][0]] + list(kernel['length_fqs'][0, del_lens])
+  df = pd.DataFrame(d)
+  return df  
+
+def get_indel_length_breakdown(pred_df):
+  # Accepts a pred_df or a PredictionResult.
+  # Returns a dataframe
+  #   - Indel length
+  #   - Predicted frequency
+  result = __as_result(pred_df)
+  kernel = get_stats_arrays([result])
+  del_lens = np.unique(result.length)
+
+  d = defaultdict(list)
+  d['Indel length'] = ['+1'] * 4
+  d['Predicted frequency'] = list(kernel['ins_base_fqs'][0])
+  d['Detail'] = list('ACGT')
+
+  for del_len in del_lens:
+    d['Indel length'] += ['-%s' % (del_len)] * 2
+    d['Predicted frequency'] += [kernel['mhless_length_fqs'][0, del_len], kernel['mh_length_fqs'][0, del_len]]
+    d['Detail'] += ['MH-less', 'Microhomology']
+
+  df = pd.DataFrame(d)
+  return df  
+
+def get_highest_frequency_indel(pred_df):
+  # Returns a row of pred_df
+  highest_fq = max(pred_df['Predicted frequency'])
+  row = pred_df[pred_df['Predicted frequency'] == highest_fq]
+  return row.iloc[0]
+
+def get_highest_frequency_length(pred_df):
+  idd = get_indel_length_fqs(pred_df)
+  highest_fq = max(idd['Predicted frequency'])
+  row = idd[idd['Predicted frequency'] == highest_fq]
+  return row.iloc[0]
+
+def get_precision(pred_df):
+  # Returns a row of pred_df
+  return get_stats_arrays([pred_df])['precision'][0]
+
+##
+# Data reformatting
+##
+NO_EDIT = -1
+
+def __get_seq_cutsite(stats):
+  if type(stats) == pd.DataFrame:
+    return stats['Reference sequence'].iloc[0], int(stats['Cutsite'].iloc[0])
+  return stats['Reference sequence'], int(stats['Cutsite'])
+
+def get_genotype_edits(pred_df, stats):
+  # Describes each row's genotype as an edit of the reference sequence:
+  # delete edit_lens[i] bases starting at edit_starts[i], then insert
+  # ins_bases[i] there. Rows without a single genotype (MH-less
+  # deletions summarized by length) have edit_lens[i] == NO_EDIT.
+  #
+  # Returns arrays (edit_starts, edit_lens, ins_bases)
+  seq, cutsite = __get_seq_cutsite(stats)
+  is_ins = np.asarray(pred_df['Category'] == 'ins')
+  gt_poss = pd.to_numeric(pred_df['Genotype position'], errors = 'coerce').values
+  lens = np.asarray(pred_df['Length'], dtype = int)
+
+  has_gt = is_ins | ~np.isnan(gt_poss)
+  edit_starts = np.where(is_ins, cutsite, cutsite - lens + np.nan_to_num(gt_poss).astype(int))
+  edit_lens = np.where(is_ins, 0, lens)
+  edit_lens[~has_gt] = NO_EDIT
+  if 'Inserted Bases' in pred_df.columns:
+    ins_bases = np.where(is_ins, pred_df['Inserted Bases'].astype(object).values, '')
+  else:
+    ins_bases = np.full(len(pred_df), '', dtype = object)
+  return edit_starts, edit_lens, ins_bases
+
+def render_genotypes(seq, edit_starts, edit_lens, ins_bases):
+  # Renders edit descriptors from get_genotype_edits into genotype strings.
+  # Only call this for rows that are displayed or downloaded.
+  return [np.nan if dl == NO_EDIT else seq[:start] + ins + seq[start + dl:] for start, dl, ins in zip(edit_starts, edit_lens, ins_bases)]
+
+def add_genotype_column(pred_df, stats):
+  if 'Genotype' in pred_df.columns:
+    return
+  seq, cutsite = __get_seq_cutsite(stats)
+  edit_starts, edit_lens, ins_bases = get_genotype_edits(pred_df, stats)
+  pred_df['Genotype'] = render_genotypes(seq, edit_starts, edit_lens, ins_bases)
+  return
+
+def get_genotype_frequency(pred_df, stats, genotype):
+  # Sums predicted frequencies of rows whose genotype equals genotype,
+  # without rendering genotype strings. An edit (start, dl, ins) of the
+  # reference gives genotype iff the lengths agree, the reference and
+  # genotype share a prefix of length start and a suffix of length
+  # len(seq) - start - dl, and ins is the genotype at start.
+  seq, cutsite = __get_seq_cutsite(stats)
+  edit_starts, edit_lens, ins_bases = get_genotype_edits(pred_df, stats)
+  ins_lens = np.array([len(ins) for ins in ins_bases], dtype = int)
+
+  # One alignment of genotype against the reference
+  max_len = min(len(seq), len(genotype))
+  prefix_len = next((idx for idx in range(max_len) if seq[idx] != genotype[idx]), max_len)
+  suffix_len = next((idx for idx in range(max_len) if seq[-1 - idx] != genotype[-1 - idx]), max_len)
+
+  has_gt = (edit_lens != NO_EDIT)
+  in_bounds = (edit_starts >= 0) & (edit_starts + edit_lens <= len(seq))
+  match = has_gt & in_bounds
+  match &= (len(seq) - edit_lens + ins_lens == len(genotype))
+  match &= (edit_starts <= prefix_len)
+  match &= (len(seq) - edit_starts - edit_lens <= suffix_len)
+  for idx in np.flatnonzero(match & (ins_lens > 0)):
+    start = edit_starts[idx]
+    match[idx] = (genotype[start : start + ins_lens[idx]] == ins_bases[idx])
+
+  # Edits reaching past the sequence ends follow python slicing, render those
+  out_of_bounds = np.flatnonzero(has_gt & ~in_bounds)
+  if len(out_of_bounds) > 0:
+    rendered = render_genotypes(seq, edit_starts[out_of_bounds], edit_lens[out_of_bounds], ins_bases[out_of_bounds])
+    match[out_of_bounds] = [gt == genotype for gt in rendered]
+
+  freqs = np.asarray(pred_df['Predicted frequency'])
+  return sum(freqs[match])
+
+def add_name_column(pred_df, stats):
+  seq, cutsite = __get_seq_cutsite(stats)
+  edit_starts, edit_lens, ins_bases = get_genotype_edits(pred_df, stats)
+
+  names = []
+  lens = np.asarray(pred_df['Length'], dtype = int)
+  for start, dl, ins, length in zip(edit_starts, edit_lens, ins_bases, lens):
+    if dl == NO_EDIT:
+      names.append('del%s' % (length))
+    elif dl > 0:
+      names.append('del%s' % (seq[start : start + dl]))
+    else:
+      names.append('ins%s' % (ins))
+  pred_df['Name'] = names
+  return
+
+def __find_mhless_positions(seq, cutsite, del_lens):
+  # Finds MH-less deletion positions for many deletion lengths at once.
+  # For each deletion length, flanks are compared along one equality
+  # diagonal, and position p is returned when it is a zero-length
+  # microhomology: both neighbouring comparisons are mismatches or
+  # flank ends.
+  #
+  # Returns a (K x W) bool array indexed by [del_len index, position]
+  seq_bytes = np.frombuffer(seq.encode('ascii'), dtype = np.uint8)
+  seq_len = len(seq_bytes)
+  end = min(cutsite, seq_len)
+  num_dls = len(del_lens)
+  width = int(max(del_lens)) + 2
+
+  # Flank bounds follow python slicing of
+  # seq[cutsite - del_len : cutsite] and seq[cutsite : cutsite + del_len]
+  left_starts = cutsite - del_lens
+  left_starts = np.clip(np.where(left_starts < 0, left_starts + seq_len, left_starts), 0, seq_len)
+  left_lens = np.maximum(end - left_starts, 0)
+  right_lens = np.maximum(np.minimum(cutsite + del_lens, seq_len) - cutsite, 0)
+  start_idxs = np.maximum(right_lens - left_lens, 0)
+  num_cmps = np.minimum(left_lens, right_lens)
+
+  idxs = np.arange(width)
+  valid = idxs < num_cmps[:, None]
+  left_idxs = np.where(valid, left_starts[:, None] + idxs, 0)
+  right_idxs = np.where(valid, cutsite + start_idxs[:, None] + idxs, 0)
+  mismatch = ~valid
+  if seq_len > 0:
+    mismatch |= seq_bytes[left_idxs] != seq_bytes[right_idxs]
+
+  # A zero-length MH starts at offset j when comparisons j - 1 and j
+  # both fail, with the flank ends counting as failures
+  prev_mismatch = np.concatenate([np.ones((num_dls, 1), dtype = bool), mismatch[:, :-1]], axis = 1)
+  rows, offsets = np.nonzero(prev_mismatch & mismatch & (idxs <= num_cmps[:, None]))
+
+  positions = np.zeros((num_dls, width), dtype = bool)
+  positions[rows, start_idxs[rows] + offsets] = True
+  return positions
+
+def add_mhless_genotypes(pred_df, stats, length_cutoff = None):
+  # Adds genotype-resolution predictions for MH-less genotypes
+  # Be wary: MH-less genotypes have much lower replicability than
+  # microhomology genotypes. 
+  # This is included for user convenience.
+  seq, cutsite = __get_seq_cutsite(stats)
+
+  is_del = pred_df['Category'] == 'del'
+  is_mhless = is_del & (pred_df['Genotype position'] == 'e')
+  ins_df = pred_df[pred_df['Category'] == 'ins']
+  mhdel_df = pred_df[is_del & ~is_mhless]
+
+  # MHless deletions by length
+  if length_cutoff is None:
+    max_del_len = max(pred_df['Length']) + 1
+  else:
+    max_del_len = int(length_cutoff)
+  subset = pred_df[is_mhless & (pred_df['Length'] < max_del_len)]
+  subset = subset.drop_duplicates('Length').sort_values('Length')
+  del_lens = subset['Length'].values.astype(int)
+  total_freqs = subset['Predicted frequency'].values.astype(float)
+
+  # Each length splits its frequency evenly over up to three categories:
+  # deletion at position 0, at position del_len, and in the middle,
+  # where the middle share is split evenly again
+  if len(del_lens) > 0:
+    positions = __find_mhless_positions(seq, cutsite, del_lens)
+  else:
+    positions = np.zeros((0, 1), dtype = bool)
+  pos_idxs = np.arange(positions.shape[1])
+  dl_col = del_lens[:, None]
+  has0 = positions[:, 0]
+  hasN = positions[np.arange(len(del_lens)), del_lens]
+  is_mid = positions & (pos_idxs > 0) & (pos_idxs < dl_col)
+  nummid = is_mid.sum(axis = 1)
+  num_mhless_cats = has0.astype(int) + hasN + (nummid > 0)
+
+  emit = is_mid.copy()
+  emit[:, 0] |= has0
+  emit[np.arange(len(del_lens)), del_lens] |= hasN
+  emit &= (num_mhless_cats > 0)[:, None]
+  rows, gt_poss = np.nonzero(emit)
+
+  # Within a length, emit position 0, then del_len, then the middle
+  order_keys = np.where(gt_poss == 0, 0, np.where(gt_poss == del_lens[rows], 1, gt_poss + 1))
+  order = np.lexsort((order_keys, rows))
+  rows, gt_poss = rows[order], gt_poss[order]
+
+  with np.errstate(divide = 'ignore', invalid = 'ignore'):
+    frac_freqs = total_freqs / num_mhless_cats
+    mid_freqs = frac_freqs / nummid
+  mid_rows = (gt_poss != 0) & (gt_poss != del_lens[rows])
+
+  # Expanded rows are written into one preallocated block
+  num_rows = len(rows)
+  mhless_dd = {
+    'Genotype position': gt_poss.astype(int),
+    'Length': del_lens[rows],
+    'Predicted frequency': np.where(mid_rows, mid_freqs[rows], frac_freqs[rows]),
+    'Category': np.full(num_rows, 'del', dtype = object),
+    'Microhomology length': np.zeros(num_rows, dtype = int),
+  }
+  if num_rows > 0:
+    mhless_df = pd.DataFrame(mhless_dd)
+  else:
+    # Same empty table as the per-length loop built, so column
+    # dtypes such as Length are upcast on concatenation as before
+    mhless_df = pd.DataFrame()
+    mhless_df['Category'] = 'del'
+    mhless_df['Microhomology length'] = 0
+
+  new_pred_df = pd.concat([ins_df, mhdel_df, mhless_df], ignore_index = True, sort = False)
+  return new_pred_df
+
+def __find_microhomologies(left, right):
+  start_idx = max(len(right) - len(left), 0)
+  mhs = []
+  mh = [start_idx]
+  for idx in range(min(len(right), len(left))):
+    if left[idx] == right[start_idx + idx]:
+      mh.append(start_idx + idx + 1)
+    else:
+      mhs.append(mh)
+      mh = [start_idx + idx +1]
+  mhs.append(mh)
+  return mhs
+
+def __add_mhless_genotypes_by_length(pred_df, stats, length_cutoff = None):
+  # Reference for add_mhless_genotypes: the previous implementation,
+  # which rescans the flanks once per deletion length
+  seq, cutsite = __get_seq_cutsite(stats)
+
+  # Add insertions
+  new_pred_df = pred_df[pred_df['Category'] == 'ins']
+
+  # Add MH deletions
+  crit = (pred_df['Genotype position'] != 'e') & (pred_df['Category'] == 'del')
+  new_pred_df = pd.concat([new_pred_df, pred_df[crit]], ignore_index = True, sort = False)
+
+  # Add MHless deletions by length
+  if length_cutoff is None:
+    max_del_len = max(pred_df['Length']) + 1
+  else:
+    max_del_len = int(length_cutoff)
+
+  mhless_dd = defaultdict(list)
+  for del_len in range(max_del_len):
+    crit = (pred_df['Category'] == 'del') & (pred_df['Length'] == del_len) & (pred_df['Genotype position'] == 'e')
+    subset = pred_df[crit]
+    if len(subset) == 0:
+      continue
+    total_freq = subset['Predicted frequency'].iloc[0]
+
+    left = seq[cutsite - del_len : cutsite]
+    right = seq[cutsite : cutsite + del_len]
+    mhs = __find_microhomologies(left, right)
+
+    has0 = bool([0] in mhs)
+    hasN = bool([del_len] in mhs)
+    nummid = 0
+    for idx in range(1, del_len):
+      if [idx] in mhs:
+        nummid += 1
+    hasmid = bool(nummid > 0)
+    num_mhless_cats = sum([has0, hasN, hasmid])
+    if num_mhless_cats == 0:
+      continue
+
+    frac_freq = total_freq / num_mhless_cats
+
+    for gt_pos, flag in zip([0, del_len], [has0, hasN]):
+      if flag:
+        mhless_dd['Genotype position'].append(gt_pos)
+        mhless_dd['Length'].append(del_len)
+        mhless_dd['Predicted frequency'].append(frac_freq)
+
+    for idx in range(1, del_len):
+      mid_pos = idx
+      if [mid_pos] in mhs:
+        mhless_dd['Genotype position'].append(mid_pos)
+        mhless_dd['Length'].append(del_len)
+        mhless_dd['Predicted frequency'].append(frac_freq / nummid)
+
+  mhless_df = pd.DataFrame(mhless_dd)
+  mhless_df['Category'] = 'del'
+  mhless_df['Microhomology length'] = 0
+  new_pred_df = pd.concat([new_pred_df, mhless_df], ignore_index = True, sort = False)
+  return new_pred_df
+
+def verify_mhless_genotypes(num_seqs = 100, seed = 0, celltype = 'mESC'):
+  # Checks add_mhless_genotypes against the per-length reference on
+  # random sequences. Some sequences are trimmed near the cutsite, so
+  # flanks are cut short at the sequence ends.
+  # Returns (True, '') or (False, description of mismatch)
+  rs = np.random.RandomState(seed)
+  for trial in range(num_seqs):
+    seq = ''.join(rs.choice(list('ACGT'), size = rs.randint(80, 200)))
+    cutsite = rs.randint(35, len(seq) - 34)
+    pred_df, stats = predict(seq, cutsite, celltype)
+    stats = pd.DataFrame(stats, index = [0])
+
+    if trial % 3 == 1:
+      # Trim the left end
+      trim = cutsite - rs.randint(0, 30)
+      stats['Reference sequence'] = seq[trim:]
+      stats['Cutsite'] = cutsite - trim
+    elif trial % 3 == 2:
+      # Trim the right end
+      stats['Reference sequence'] = seq[:cutsite + rs.randint(0, 30)]
+
+    for length_cutoff in [None, rs.randint(0, 40)]:
+      new = add_mhless_genotypes(pred_df, stats, length_cutoff = length_cutoff)
+      ref = __add_mhless_genotypes_by_length(pred_df, stats, length_cutoff = length_cutoff)
+      try:
+        pd.testing.assert_frame_equal(new, ref)
+      except AssertionError as e:
+        return False, 'MH-less genotypes differ from reference at trial %s, length cutoff %s: %s' % (trial, length_cutoff, e)
+  return True, ''
+
+
+##
+# Model bundle
+##
+def __get_model_dir():
+  return os.path.dirname(os.path.realpath(__file__)) + '/model'
+
+def get_bundle_fn(run_iter = 'aax', param_iter = 'aag'):
+  return '%s/%s_%s.bundle' % (__get_model_dir(), run_iter, param_iter)
+
+def __load_pickle(fn):
+  with open(fn, 'rb') as f:
+    # load in python3.6 a pickle that was dumped from python2.7
+    return pickle.load(f, encoding = 'latin1')
+
+RATE_MODEL_TREE_ARRAYS = ['idx_array', 'idx_start', 'idx_end', 'is_leaf', 'node_bounds']
+
+def __load_rate_model_state(fn):
+  # Reads a pickled sklearn KNeighborsRegressor without importing sklearn.
+  # Returns its attribute dict.
+  class ModelState:
+    def __init__(self, *args, **kwargs):
+      return
+    def __setstate__(self, state):
+      self.state = state
+
+  class StateUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+      if module.split('.')[0] == 'sklearn':
+        return ModelState
+      return pickle.Unpickler.find_class(self, module, name)
+
+  with open(fn, 'rb') as f:
+    state = StateUnpickler(f, encoding = 'latin1').load().state
+  if state['weights'] != 'distance' or state['effective_metric_'] != 'euclidean' or state['_fit_method'] != 'kd_tree':
+    raise ValueError('%s is not a distance-weighted euclidean kd_tree KNN model' % (fn))
+
+  # KDTree state: (data, idx_array, node_data, node_bounds, ...)
+  tree_state = state['_tree'].state
+  node_data = tree_state[2]
+  state['_tree'] = {
+    'idx_array': np.asarray(tree_state[1], dtype = np.int64),
+    'idx_start': np.asarray(node_data['idx_start'], dtype = np.int64),
+    'idx_end': np.asarray(node_data['idx_end'], dtype = np.int64),
+    'is_leaf': np.asarray(node_data['is_leaf'], dtype = np.int64),
+    'node_bounds': np.asarray(tree_state[3], dtype = float),
+  }
+  return state
+
+def __load_rate_model(fn):
+  state = __load_rate_model_state(fn)
+  return KNeighborsRateModel(state['_fit_X'], state['_y'], state['n_neighbors'], state['_tree'])
+
+def __bp_model_to_array(model):
+  # Converts a nested dict keyed by bases into a dense array
+  # indexed by BASE_CODES at every level: (4, 4, 4, 4) for
+  # mESC and U2OS, (4, 4) for K562, HEK293 and HCT116.
+  # Returns (array, key order of the innermost dicts)
+  if not isinstance(model, dict):
+    return np.array(model, dtype = float), None
+  arr = np.full((4,) * __bp_model_depth(model), np.nan)
+  ins_order = None
+  for base, sub in model.items():
+    arr[BASE_CODES[ord(base)]], sub_order = __bp_model_to_array(sub)
+    if sub_order is None:
+      sub_order = ''.join(model.keys())
+    if ins_order is not None and ins_order != sub_order:
+      raise ValueError('bp_model dicts have inconsistent key orders')
+    ins_order = sub_order
+  return arr, ins_order
+
+def __bp_model_depth(model):
+  if not isinstance(model, dict):
+    return 0
+  return 1 + __bp_model_depth(next(iter(model.values())))
+
+def convert_models(run_iter = 'aax', param_iter = 'aag', out_fn = None):
+  # One-time conversion of the pickled models into a model bundle
+  # (see model_bundle.py) that init_model memory-maps.
+  # The NN lookup tables are stored precomputed.
+  model_dir = __get_model_dir()
+  if out_fn is None:
+    out_fn = get_bundle_fn(run_iter, param_iter)
+
+  arrays = dict()
+  meta = {'run_iter': run_iter, 'param_iter': param_iter}
+  params = dict()
+  for name in ['nn', 'nn2']:
+    params[name] = __load_pickle('%s/%s_%s_%s.pkl' % (model_dir, run_iter, param_iter, name))
+    meta['%s_layers' % (name)] = len(params[name])
+    for idx, (W, b) in enumerate(params[name]):
+      arrays['%s.%s.W' % (name, idx)] = W
+      arrays['%s.%s.b' % (name, idx)] = b
+  arrays['nn_table'], arrays['nn2_table'] = __build_nn_tables(params['nn'], params['nn2'])
+
+  for celltype in CELLTYPES:
+    arrays['normalizer.%s' % (celltype)] = np.array(__load_pickle('%s/Normalizer_%s.pkl' % (model_dir, celltype)), dtype = float)
+    arr, ins_order = __bp_model_to_array(__load_pickle('%s/bp_model_%s.pkl' % (model_dir, celltype)))
+    arrays['bp_model.%s' % (celltype)] = arr
+    meta['bp_ins_order.%s' % (celltype)] = ins_order
+    state = __load_rate_model_state('%s/rate_model_%s.pkl' % (model_dir, celltype))
+    arrays['rate_model.%s.fit_X' % (celltype)] = state['_fit_X']
+    arrays['rate_model.%s.y' % (celltype)] = state['_y']
+    for name in RATE_MODEL_TREE_ARRAYS:
+      arrays['rate_model.%s.tree.%s' % (celltype, name)] = state['_tree'][name]
+    meta['rate_model_n_neighbors.%s' % (celltype)] = int(state['n_neighbors'])
+  meta['celltypes'] = CELLTYPES
+
+  model_bundle.write_bundle(out_fn, arrays, meta)
+  model_bundle.read_bundle(out_fn, verify = True)
+  return out_fn
+
+def __init_from_bundle(bundle_fn):
+  global nn_params
+  global nn2_params
+  global nn_table
+  global nn2_table
+  global bundle_arrays
+  global bundle_meta
+  arrays, meta = model_bundle.read_bundle(bundle_fn)
+  nn_params = [(arrays['nn.%s.W' % (idx)], arrays['nn.%s.b' % (idx)]) for idx in range(meta['nn_layers'])]
+  nn2_params = [(arrays['nn2.%s.W' % (idx)], arrays['nn2.%s.b' % (idx)]) for idx in range(meta['nn2_layers'])]
+  nn_table = arrays['nn_table']
+  nn2_table = arrays['nn2_table']
+  bundle_arrays = arrays
+  bundle_meta = meta
+  return
+
+def __init_from_pickles(run_iter, param_iter):
+  global nn_params
+  global nn2_params
+  global nn_table
+  global nn2_table
+  model_dir = __get_model_dir()
+  nn_params = __load_pickle('%s/%s_%s_nn.pkl' % (model_dir, run_iter, param_iter))
+  nn2_params = __load_pickle('%s/%s_%s_nn2.pkl' % (model_dir, run_iter, param_iter))
+
+  # Precompute both networks over their entire input domains
+  nn_table, nn2_table = __build_nn_tables(nn_params, nn2_params)
+  return
+
+##
+# Init
+##
+def get_preload_celltypes():
+  # Cell types listed in INDELPHI_PRELOAD_CELLTYPES, comma-separated,
+  # or 'all'. Defaults to none: cell types then load on first use.
+  text = os.getenv('INDELPHI_PRELOAD_CELLTYPES', '')
+  if text.strip().lower() == 'all':
+    return list(CELLTYPES)
+  return [celltype.strip() for celltype in text.split(',') if celltype.strip() != '']
+
+def init_celltype(celltype):
+  # Loads bp_model, normalizer and rate_model for one cell type
+  # on first use. Safe to call from several threads.
+  if celltype in rate_model:
+    return
+  if celltype not in CELLTYPES:
+    raise ValueError('Unknown celltype %s, expected one of %s' % (celltype, ', '.join(CELLTYPES)))
+  with model_lock:
+    if init_flag == False:
+      init_model()
+    if celltype in rate_model:
+      return
+
+    # Set rate_model last: a cell type is ready once it is present
+    if bundle_arrays is not None:
+      normalizer[celltype] = bundle_arrays['normalizer.%s' % (celltype)]
+      bp_model[celltype] = bundle_arrays['bp_model.%s' % (celltype)]
+      bp_ins_codes[celltype] = __encode_seq(bundle_meta['bp_ins_order.%s' % (celltype)])
+      rate_model[celltype] = KNeighborsRateModel(
+        bundle_arrays['rate_model.%s.fit_X' % (celltype)],
+        bundle_arrays['rate_model.%s.y' % (celltype)],
+        bundle_meta['rate_model_n_neighbors.%s' % (celltype)],
+        {name: bundle_arrays['rate_model.%s.tree.%s' % (celltype, name)] for name in RATE_MODEL_TREE_ARRAYS},
+      )
+    else:
+      model_dir = __get_model_dir()
+      arr, ins_order = __bp_model_to_array(__load_pickle('%s/bp_model_%s.pkl' % (model_dir, celltype)))
+      bp_model[celltype] = arr
+      bp_ins_codes[celltype] = __encode_seq(ins_order)
+      normalizer[celltype] = np.array(__load_pickle('%s/Normalizer_%s.pkl' % (model_dir, celltype)), dtype = float)
+      rate_model[celltype] = __load_rate_model('%s/rate_model_%s.pkl' % (model_dir, celltype))
+  return
+
+def init_model(run_iter = 'aax', 
+               param_iter = 'aag',
+               verify_tables = False,
+               preload_celltypes = None):
+  # Loads the shared deletion models. Cell type models load lazily
+  # in init_celltype, except for preload_celltypes, which defaults
+  # to get_preload_celltypes().
+  global init_flag
+  with model_lock:
+    if init_flag != False:
+      return
+
+    print('Initializing models %s/%s...' % (run_iter, param_iter))
+
+    # Prefer the memory-mapped bundle written by convert_models.py
+    bundle_fn = get_bundle_fn(run_iter, param_iter)
+    if os.path.isfile(bundle_fn):
+      __init_from_bundle(bundle_fn)
+    else:
+      __init_from_pickles(run_iter, param_iter)
+
+    if verify_tables:
+      ok, error = verify_nn_tables()
+      if not ok:
+        raise ValueError(error)
+
+    init_flag = True
+
+    if preload_celltypes is None:
+      preload_celltypes = get_preload_celltypes()
+    for celltype in preload_celltypes:
+      init_celltype(celltype)
+
+    print('Done')
+  return
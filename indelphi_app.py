@@ -1,5 +1,5 @@
-import dash
-
-app = dash.Dash()
-server = app.server
+import dash
+
+app = dash.Dash()
+server = app.server
 app.config.suppress_callback_exceptions = True
\ No newline at end of file
@@ -0,0 +1,83 @@
+import numpy as np
+import json, hashlib
+
+##
+# Memory-mappable model bundle
+##
+# Layout:
+#   MAGIC (8 bytes)
+#   header length (uint64, little-endian)
+#   header (json): version, meta, and per-array dtype, shape, offset,
+#                  number of bytes and sha256
+#   array data, each array aligned to ALIGNMENT bytes
+#
+# Arrays are read back as read-only views of one np.memmap of the file,
+# so worker processes share the pages through the OS cache.
+MAGIC = b'INDELPHI'
+BUNDLE_VERSION = 2
+ALIGNMENT = 64
+
+def __align(offset):
+  return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def __checksum(buf):
+  return hashlib.sha256(np.ascontiguousarray(buf).reshape(-1).view(np.uint8)).hexdigest()
+
+def write_bundle(out_fn, arrays, meta = None):
+  # arrays: dict of name -> np.ndarray
+  # meta: json-serializable dict
+  entries = dict()
+  offset = 0
+  for name in sorted(arrays):
+    arr = np.ascontiguousarray(arrays[name])
+    if arr.dtype.hasobject:
+      raise ValueError('Cannot bundle object array %s' % (name))
+    entries[name] = {
+      'dtype': arr.dtype.str,
+      'shape': list(arr.shape),
+      'offset': offset,
+      'nbytes': int(arr.nbytes),
+      'sha256': __checksum(arr),
+    }
+    offset = __align(offset + arr.nbytes)
+  header = {
+    'version': BUNDLE_VERSION,
+    'meta': meta if meta is not None else dict(),
+    'arrays': entries,
+  }
+  header = json.dumps(header, sort_keys = True).encode('utf-8')
+  data_start = __align(len(MAGIC) + 8 + len(header))
+
+  with open(out_fn, 'wb') as f:
+    f.write(MAGIC)
+    f.write(np.uint64(len(header)).tobytes())
+    f.write(header)
+    f.write(b'\0' * (data_start - f.tell()))
+    for name in sorted(arrays):
+      arr = np.ascontiguousarray(arrays[name])
+      f.write(b'\0' * (data_start + entries[name]['offset'] - f.tell()))
+      f.write(arr.tobytes())
+  return
+
+def read_bundle(fn, verify = True):
+  # Returns (arrays, meta). Arrays are read-only views of the file.
+  # Raises ValueError on a bad magic, version or checksum.
+  with open(fn, 'rb') as f:
+    magic = f.read(len(MAGIC))
+    if magic != MAGIC:
+      raise ValueError('%s is not a model bundle' % (fn))
+    header_len = int(np.frombuffer(f.read(8), dtype = '<u8')[0])
+    header = json.loads(f.read(header_len).decode('utf-8'))
+  if header['version'] != BUNDLE_VERSION:
+    raise ValueError('%s has bundle version %s, expected %s. Rerun convert_models.py' % (fn, header['version'], BUNDLE_VERSION))
+  data_start = __align(len(MAGIC) + 8 + header_len)
+
+  data = np.memmap(fn, dtype = np.uint8, mode = 'r')
+  arrays = dict()
+  for name, entry in header['arrays'].items():
+    start = data_start + entry['offset']
+    buf = data[start : start + entry['nbytes']]
+    if verify and __checksum(buf) != entry['sha256']:
+      raise ValueError('Checksum mismatch for %s in %s' % (name, fn))
+    arrays[name] = buf.view(entry['dtype']).reshape(entry['shape'])
+  return arrays, header['meta']
@@ -0,0 +1,36 @@
+import sys
+import pandas as pd
+
+import inDelphi
+
+# PAM-agnostic scan of every cutsite on both strands of one sequence.
+# Usage: python scan_cutsites.py [seq_fn] [out_fn] [celltype ...]
+#   seq_fn: plain text or single-record fasta
+#   out_fn: csv with one row per cutsite and celltype
+#   celltypes default to all of inDelphi.CELLTYPES
+def read_seq(seq_fn):
+  with open(seq_fn) as f:
+    lines = [line.strip() for line in f]
+  return ''.join([line for line in lines if not line.startswith('>')])
+
+def scan_to_dataframe(seq, celltypes = None):
+  ans = inDelphi.scan_all_cutsites(seq, celltypes = celltypes)
+  if type(ans) == str:
+    raise ValueError(ans)
+  sites, stats = ans
+  dfs = []
+  for celltype in stats:
+    df = pd.concat([sites, pd.DataFrame(stats[celltype], columns = inDelphi.SCAN_STATS_COLUMNS)], axis = 1)
+    df['Celltype'] = celltype
+    dfs.append(df)
+  return pd.concat(dfs, ignore_index = True)
+
+if __name__ == '__main__':
+  if len(sys.argv) < 3:
+    print('Usage: python scan_cutsites.py [seq_fn] [out_fn] [celltype ...]')
+    sys.exit(1)
+  seq_fn, out_fn = sys.argv[1], sys.argv[2]
+  celltypes = sys.argv[3:] if len(sys.argv) > 3 else None
+  df = scan_to_dataframe(read_seq(seq_fn), celltypes = celltypes)
+  df.to_csv(out_fn, index = False)
+  print('Wrote %s cutsites to %s' % (len(df), out_fn))
@@ -0,0 +1,384 @@
+import argparse, gzip, json, os
+import multiprocessing
+from collections import deque
+import numpy as np
+import pandas as pd
+
+import inDelphi
+import lib
+
+##
+# Genome-scale offline scanner
+##
+# Finds gRNAs matching a PAM in the exons of a (gzipped) fasta and
+# writes inDelphi predictions in the same columns as the precomputed
+# {genome}_{celltype}_{cas9}_{gene}.csv tables used by the gene page.
+#
+# Sites are enumerated per chromosome and split into fixed-size chunks.
+# Each chunk is predicted in a worker process and written to
+#   out_dir/{genome}_{celltype}_{cas9}_{chrom}_{chunk}.{format}
+# and recorded in out_dir/checkpoint.json, so an interrupted run resumes
+# at the first unfinished chunk. python gene_store.py build combines
+# the chunks of one celltype into a gene table store.
+#
+# Usage: python scan_genome.py genome.fa.gz out_dir --genome mm10 [--exons exons.gtf]
+CONTEXT_RADIUS = 60
+CHUNK_SIZE = 5000
+CHECKPOINT_FN = 'checkpoint.json'
+OUTPUT_FORMATS = {
+  'parquet': 'parquet',
+  'arrow': 'arrow',
+  'csv': 'csv',
+}
+ANNOTATION_COLUMNS = [
+  'Cas9 type',
+  'Celltype',
+  'Chromosome',
+  'Cutsite distance to 3p boundary',
+  'Cutsite distance to 5p boundary',
+  'Exon end',
+  'Exon number',
+  'Exon start',
+  'Exon strand',
+  'Gene symbol',
+  'Genome',
+  'Local context',
+  'Local cutsite',
+  'gRNA',
+  'gRNA strand w.r.t. exon strand',
+  'kgID',
+]
+OUTPUT_COLUMNS = ANNOTATION_COLUMNS + inDelphi.SCAN_STATS_COLUMNS
+
+##
+# Input parsing
+##
+def open_text(fn):
+  if fn.endswith('.gz'):
+    return gzip.open(fn, 'rt')
+  return open(fn)
+
+def read_fasta(fn):
+  # Yields (name, sequence) one record at a time, uppercased
+  name, lines = None, []
+  with open_text(fn) as f:
+    for line in f:
+      line = line.strip()
+      if line.startswith('>'):
+        if name is not None:
+          yield name, ''.join(lines).upper()
+        name, lines = line[1:].split()[0], []
+      elif line:
+        lines.append(line)
+  if name is not None:
+    yield name, ''.join(lines).upper()
+
+def __parse_gtf_attributes(text):
+  attributes = dict()
+  for item in text.strip().split(';'):
+    item = item.strip()
+    if not item:
+      continue
+    key, _, value = item.partition(' ')
+    attributes[key] = value.strip().strip('"')
+  return attributes
+
+def read_exons(fn):
+  # Reads exons from a gtf/gff or bed file (bed6 or bed12, optionally gzipped).
+  # Returns a dataframe with 0-based half-open coordinates:
+  #   Chromosome, Exon start, Exon end, Exon strand, Exon number, Gene symbol, kgID
+  rows = []
+  is_gtf = any(ext in fn for ext in ['.gtf', '.gff'])
+  with open_text(fn) as f:
+    for line in f:
+      if line.startswith('#') or line.startswith('track') or line.startswith('browser') or not line.strip():
+        continue
+      w = line.rstrip('\n').split('\t')
+      if is_gtf:
+        if w[2] != 'exon':
+          continue
+        attributes = __parse_gtf_attributes(w[8])
+        kgid = attributes.get('transcript_id', attributes.get('gene_id', ''))
+        rows.append({
+          'Chromosome': w[0],
+          'Exon start': int(w[3]) - 1,
+          'Exon end': int(w[4]),
+          'Exon strand': w[6],
+          'Exon number': int(attributes['exon_number']) if 'exon_number' in attributes else None,
+          'Gene symbol': attributes.get('gene_name', attributes.get('gene_id', kgid)),
+          'kgID': kgid,
+        })
+      else:
+        chrom, start, end = w[0], int(w[1]), int(w[2])
+        name = w[3] if len(w) > 3 else '%s:%s-%s' % (chrom, start, end)
+        strand = w[5] if len(w) > 5 else '+'
+        if len(w) >= 12:
+          sizes = [int(s) for s in w[10].strip(',').split(',')]
+          starts = [int(s) for s in w[11].strip(',').split(',')]
+          blocks = [(start + s, start + s + size) for s, size in zip(starts, sizes)]
+        else:
+          blocks = [(start, end)]
+        for block_start, block_end in blocks:
+          rows.append({
+            'Chromosome': chrom,
+            'Exon start': block_start,
+            'Exon end': block_end,
+            'Exon strand': strand,
+            'Exon number': None,
+            'Gene symbol': name,
+            'kgID': name,
+          })
+  exons = pd.DataFrame(rows, columns = ['Chromosome', 'Exon start', 'Exon end', 'Exon strand', 'Exon number', 'Gene symbol', 'kgID'])
+
+  # Number exons 5' to 3' within each transcript when not given
+  missing = exons['Exon number'].isnull()
+  if missing.any():
+    order_key = np.where(exons['Exon strand'] == '-', -exons['Exon start'], exons['Exon start'])
+    ranks = pd.Series(order_key, index = exons.index).groupby(exons['kgID']).rank(method = 'first')
+    exons.loc[missing, 'Exon number'] = ranks[missing]
+  exons['Exon number'] = exons['Exon number'].astype(int)
+  return exons
+
+def whole_chromosome_exons(chrom, seq_len):
+  # Without annotations, each fasta record is treated as one + strand exon
+  return pd.DataFrame({
+    'Chromosome': [chrom],
+    'Exon start': [0],
+    'Exon end': [seq_len],
+    'Exon strand': ['+'],
+    'Exon number': [1],
+    'Gene symbol': [chrom],
+    'kgID': [chrom],
+  })
+
+##
+# Site enumeration
+##
+def find_sites(seq, pam):
+  # All gRNAs on both strands with a full CONTEXT_RADIUS context of ACGT.
+  # Returns (cutsites, orientations) sorted by + strand cutsite, then orientation,
+  # where cutsite c is the + strand cut between positions c - 1 and c.
+  r = CONTEXT_RADIUS
+  n = len(seq)
+  plus = lib.find_pam_cutsites(seq, pam, r, n - r + 1)
+  minus = n - lib.find_pam_cutsites(lib.revcomp(seq), pam, r, n - r + 1)
+  cutsites = np.concatenate([plus, minus])
+  orients = np.concatenate([np.zeros(len(plus), dtype = int), np.ones(len(minus), dtype = int)])
+
+  # Drop contexts with N or other non-ACGT characters
+  dna = np.frombuffer(seq.encode('ascii'), dtype = np.uint8)
+  is_acgt = np.zeros(256, dtype = bool)
+  is_acgt[[ord(char) for char in 'ACGT']] = True
+  num_bad = np.concatenate([[0], np.cumsum(~is_acgt[dna])])
+  ok = (num_bad[cutsites + r] - num_bad[cutsites - r]) == 0
+  cutsites, orients = cutsites[ok], orients[ok]
+
+  order = np.lexsort((orients, cutsites))
+  return cutsites[order], np.array(['+', '-'])[orients[order]]
+
+def assign_sites_to_exons(cutsites, exons):
+  # Pairs every exon with the sites cutting within it, in exon order.
+  # Returns (site indices, exon indices).
+  lo = np.searchsorted(cutsites, exons['Exon start'].values, side = 'left')
+  hi = np.searchsorted(cutsites, exons['Exon end'].values, side = 'right')
+  counts = hi - lo
+  exon_idxs = np.repeat(np.arange(len(exons)), counts)
+  starts = np.repeat(lo - np.cumsum(np.concatenate([[0], counts[:-1]])), counts)
+  site_idxs = starts + np.arange(counts.sum())
+  return site_idxs, exon_idxs
+
+def build_chunk_rows(seq, chrom, cutsites, orients, exons, site_idxs, exon_idxs):
+  # Annotation columns for one chunk of (site, exon) pairs
+  r = CONTEXT_RADIUS
+  chunk_cutsites = cutsites[site_idxs]
+  chunk_orients = orients[site_idxs]
+  exon_starts = exons['Exon start'].values[exon_idxs]
+  exon_ends = exons['Exon end'].values[exon_idxs]
+  exon_strands = exons['Exon strand'].values[exon_idxs]
+
+  contexts = [seq[c - r : c + r] for c in chunk_cutsites]
+  contexts = [lib.revcomp(context) if orient == '-' else context for context, orient in zip(contexts, chunk_orients)]
+  minus_exon = (exon_strands == '-')
+  return pd.DataFrame({
+    'Chromosome': chrom,
+    'Cutsite distance to 3p boundary': np.where(minus_exon, chunk_cutsites - exon_starts, exon_ends - chunk_cutsites),
+    'Cutsite distance to 5p boundary': np.where(minus_exon, exon_ends - chunk_cutsites, chunk_cutsites - exon_starts),
+    'Exon end': exon_ends,
+    'Exon number': exons['Exon number'].values[exon_idxs],
+    'Exon start': exon_starts,
+    'Exon strand': exon_strands,
+    'Gene symbol': exons['Gene symbol'].values[exon_idxs],
+    'Local context': contexts,
+    'Local cutsite': r,
+    'gRNA': [context[r - 17 : r + 3] for context in contexts],
+    'gRNA strand w.r.t. exon strand': np.where(chunk_orients == exon_strands, '+', '-'),
+    'kgID': exons['kgID'].values[exon_idxs],
+  })
+
+##
+# Prediction workers
+##
+def __init_worker(celltypes):
+  inDelphi.init_model(preload_celltypes = celltypes)
+  return
+
+def predict_chunk(task):
+  # Predicts one chunk and writes one file per celltype.
+  # Files are written to a temporary name first, so a file that exists is complete.
+  key, rows, celltypes, genome, cas9_type, out_fns, fmt = task
+  contexts = list(rows['Local context'])
+  unique_contexts = sorted(set(contexts))
+  preds = inDelphi.predict_batch_all_celltypes(
+    unique_contexts,
+    [CONTEXT_RADIUS] * len(unique_contexts),
+    celltypes = celltypes,
+    as_dataframe = False,
+  )
+  context_to_idx = {context: idx for idx, context in enumerate(unique_contexts)}
+  row_idxs = [context_to_idx[context] for context in contexts]
+  for celltype in celltypes:
+    stats = np.array([[preds[idx][celltype][1][col] for col in inDelphi.SCAN_STATS_COLUMNS] for idx in range(len(preds))])
+    df = rows.copy()
+    df['Cas9 type'] = cas9_type
+    df['Celltype'] = celltype
+    df['Genome'] = genome
+    for jdx, col in enumerate(inDelphi.SCAN_STATS_COLUMNS):
+      df[col] = stats[row_idxs, jdx] if len(row_idxs) > 0 else []
+    write_table(df[OUTPUT_COLUMNS], out_fns[celltype], fmt)
+  return key
+
+def write_table(df, out_fn, fmt):
+  tmp_fn = out_fn + '.tmp'
+  if fmt == 'parquet':
+    df.to_parquet(tmp_fn, index = False)
+  elif fmt == 'arrow':
+    df.reset_index(drop = True).to_feather(tmp_fn)
+  else:
+    df.to_csv(tmp_fn)
+  os.replace(tmp_fn, out_fn)
+  return
+
+##
+# Checkpointing
+##
+def task_key(chrom, chunk_idx):
+  return '%s:%s' % (chrom, chunk_idx)
+
+def chunk_fn(out_dir, genome, celltype, cas9_type, chrom, chunk_idx, fmt):
+  return os.path.join(out_dir, '%s_%s_%s_%s_%05d.%s' % (genome, celltype, cas9_type, chrom, chunk_idx, OUTPUT_FORMATS[fmt]))
+
+def load_checkpoint(out_dir, params):
+  # Returns the set of finished task keys.
+  # Resuming with different parameters would mix incompatible chunks, so it is an error.
+  fn = os.path.join(out_dir, CHECKPOINT_FN)
+  if not os.path.isfile(fn):
+    return set()
+  with open(fn) as f:
+    checkpoint = json.load(f)
+  if checkpoint['params'] != params:
+    raise ValueError('%s was written with different parameters: %s' % (fn, checkpoint['params']))
+  return set(checkpoint['done'])
+
+def save_checkpoint(out_dir, params, done):
+  fn = os.path.join(out_dir, CHECKPOINT_FN)
+  with open(fn + '.tmp', 'w') as f:
+    json.dump({'params': params, 'done': sorted(done)}, f)
+  os.replace(fn + '.tmp', fn)
+  return
+
+##
+# Main
+##
+def iter_tasks(fasta_fn, exons, params, done, out_dir):
+  # Yields prediction tasks for unfinished chunks, one chromosome at a time
+  for chrom, seq in read_fasta(fasta_fn):
+    if exons is None:
+      chrom_exons = whole_chromosome_exons(chrom, len(seq))
+    else:
+      chrom_exons = exons[exons['Chromosome'] == chrom].reset_index(drop = True)
+      if len(chrom_exons) == 0:
+        continue
+    cutsites, orients = find_sites(seq, params['pam'])
+    site_idxs, exon_idxs = assign_sites_to_exons(cutsites, chrom_exons)
+    num_chunks = -(-len(site_idxs) // params['chunk_size'])
+    print('%s: %s sites, %s chunks' % (chrom, len(site_idxs), num_chunks))
+    for chunk_idx in range(num_chunks):
+      out_fns = {celltype: chunk_fn(out_dir, params['genome'], celltype, params['cas9_type'], chrom, chunk_idx, params['format']) for celltype in params['celltypes']}
+      key = task_key(chrom, chunk_idx)
+      if key in done and all(os.path.isfile(fn) for fn in out_fns.values()):
+        continue
+      chunk = slice(chunk_idx * params['chunk_size'], (chunk_idx + 1) * params['chunk_size'])
+      rows = build_chunk_rows(seq, chrom, cutsites, orients, chrom_exons, site_idxs[chunk], exon_idxs[chunk])
+      yield (key, rows, params['celltypes'], params['genome'], params['cas9_type'], out_fns, params['format'])
+
+def scan_genome(fasta_fn, out_dir, genome, exons_fn = None, pam = 'NGG', cas9_type = 'SpCas9', celltypes = None, processes = None, chunk_size = CHUNK_SIZE, fmt = 'parquet'):
+  if celltypes is None:
+    celltypes = list(inDelphi.CELLTYPES)
+  for celltype in celltypes:
+    if celltype not in inDelphi.CELLTYPES:
+      raise ValueError('Unknown celltype %s' % (celltype))
+  if fmt in ['parquet', 'arrow']:
+    try:
+      import pyarrow
+    except ImportError:
+      raise ImportError('Format %s needs pyarrow. Install it or use csv' % (fmt))
+  if not os.path.isdir(out_dir):
+    os.makedirs(out_dir)
+  params = {
+    'fasta': os.path.abspath(fasta_fn),
+    'exons': os.path.abspath(exons_fn) if exons_fn is not None else None,
+    'genome': genome,
+    'pam': pam.upper(),
+    'cas9_type': cas9_type,
+    'celltypes': celltypes,
+    'chunk_size': chunk_size,
+    'format': fmt,
+  }
+  done = load_checkpoint(out_dir, params)
+  exons = read_exons(exons_fn) if exons_fn is not None else None
+
+  # Pool.imap would read every task ahead, so at most a few chunks
+  # per process are kept in flight
+  if processes is None:
+    processes = os.cpu_count()
+  pending = deque()
+  def finish_oldest():
+    key = pending.popleft().get()
+    done.add(key)
+    save_checkpoint(out_dir, params, done)
+    print('Finished %s' % (key))
+
+  with multiprocessing.Pool(processes, initializer = __init_worker, initargs = (celltypes,)) as pool:
+    for task in iter_tasks(fasta_fn, exons, params, done, out_dir):
+      pending.append(pool.apply_async(predict_chunk, (task,)))
+      if len(pending) >= 2 * processes:
+        finish_oldest()
+    while pending:
+      finish_oldest()
+  return
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description = 'Predict repair outcomes for all PAM sites in a genome.')
+  parser.add_argument('fasta', help = 'genome fasta, optionally gzipped')
+  parser.add_argument('out_dir')
+  parser.add_argument('--genome', required = True, help = 'genome build name, e.g. mm10 or hg38')
+  parser.add_argument('--exons', default = None, help = 'bed or gtf of exons. Default: whole chromosomes')
+  parser.add_argument('--pam', default = 'NGG')
+  parser.add_argument('--cas9-type', default = 'SpCas9')
+  parser.add_argument('--celltypes', nargs = '+', default = None)
+  parser.add_argument('--processes', type = int, default = None)
+  parser.add_argument('--chunk-size', type = int, default = CHUNK_SIZE)
+  parser.add_argument('--format', choices = sorted(OUTPUT_FORMATS), default = 'parquet', help = 'parquet and arrow need pyarrow')
+  args = parser.parse_args()
+  scan_genome(
+    args.fasta,
+    args.out_dir,
+    args.genome,
+    exons_fn = args.exons,
+    pam = args.pam,
+    cas9_type = args.cas9_type,
+    celltypes = args.celltypes,
+    processes = args.processes,
+    chunk_size = args.chunk_size,
+    fmt = args.format,
+  )
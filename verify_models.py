@@ -0,0 +1,16 @@
+import sys
+
+import inDelphi
+
+# Checks the vectorized model code against its reference implementations:
+# the network lookup tables and MH-less genotype expansion.
+# Usage: python verify_models.py [num_seqs] [seed]
+if __name__ == '__main__':
+  num_seqs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+  seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+  inDelphi.init_model(verify_tables = True)
+  ok, error = inDelphi.verify_mhless_genotypes(num_seqs = num_seqs, seed = seed)
+  if not ok:
+    print(error)
+    sys.exit(1)
+  print('OK')
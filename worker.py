@@ -1,14 +1,14 @@
-import os
-
-import redis
-from rq import Worker, Queue, Connection
-
-listen = ['high', 'default', 'low']
-
-redis_url = os.getenv('REDISTOGO_URL', 'redis://localhost:6379')
-conn = redis.from_url(redis_url)
-
-if __name__ == '__main__':
-  with Connection(conn):
-    worker = Worker(map(Queue, listen))
+import os
+
+import redis
+from rq import Worker, Queue, Connection
+
+listen = ['high', 'default', 'low']
+
+redis_url = os.getenv('REDISTOGO_URL', 'redis://localhost:6379')
+conn = redis.from_url(redis_url)
+
+if __name__ == '__main__':
+  with Connection(conn):
+    worker = Worker(map(Queue, listen))
     worker.work()
\ No newline at end of file